@@ -1,71 +1,463 @@
 """
 `__main__.py` is executed when the module is run directly via `python -m module`
 """
-from typing import Protocol, Any, Optional
+from typing import Any, Optional, Iterator, TYPE_CHECKING
+from types import ModuleType
+from dataclasses import dataclass
 import argparse
+import contextlib
+import json
+import os
 import time
 import pathlib
 import io
-import importlib
+import sys
+import traceback
 
+from .cache import ResultCache, default_directory, file_digest
+from .solutions import (
+    available_days,
+    format_duration,
+    format_durations,
+    load_module,
+    load_solution,
+    solve_timed,
+)
+
+# Profiling, tracing, batch and benchmark support is imported only when used:
+# every run pays for module-level imports, even of features it does not use.
+if TYPE_CHECKING:
+    import cProfile
 
 OUTPUT_FORMAT = "Part 1: {}\nPart 2: {}"
 
 
-class Solution(Protocol):
-    def __call__(self, data: io.StringIO) -> tuple[Any, Any]:
-        raise NotImplementedError
+def input_path(day: int, example: bool, data_dir: pathlib.Path) -> pathlib.Path:
+    """Path to the input data of a given day"""
+    return data_dir / (f"day{day}_ex.txt" if example else f"day{day}.txt")
 
 
-def load_solution(day: int) -> Optional[Solution]:
-    """Load the solution for a given day"""
-    try:
-        # this programmatically performs a relative import
-        # for day 5, this is equivalent to `import .day5 as module`
-        module = importlib.import_module(f".day{day}", __package__)
-    except ImportError:
-        return None
-    else:
-        assert (
-            hasattr(module, "solve"),
-            "Each day must define solve(:io.StringIO) -> tuple[Any, Any]",
-        )
-        return module.solve
+@dataclass(frozen=True)
+class RunOptions:
+    """Options on how to run the solution of a day"""
+
+    #: whether to use the example instead of the full input
+    example: bool = False
+    #: directory with the daily input
+    data_dir: pathlib.Path = pathlib.Path("data")
+    #: cache for results or `None` to always solve
+    cache: Optional[ResultCache] = None
+    #: whether to solve and store results even if they are cached
+    refresh: bool = False
+    #: whether to memory map the input instead of reading it into memory
+    mapped: bool = False
+    #: file, FIFO or "-" for stdin to stream input from instead of `data_dir`
+    stream: Optional[str] = None
+    #: number of top functions to show from profiling or 0 to not profile
+    profile: int = 0
+    #: directory to dump profiles to for use with `pstats`, `snakeviz`, ...
+    profile_dir: Optional[pathlib.Path] = None
+    #: number of top allocation sites to show from tracing memory or 0 for none
+    memory: int = 0
+    #: maximum traced memory of any phase in bytes to not fail the solution
+    memory_budget: Optional[int] = None
+
+    @property
+    def instrumented(self) -> bool:
+        """Whether the solution must actually run, not just use cached results"""
+        return bool(self.profile) or self.traced
+
+    @property
+    def traced(self) -> bool:
+        """Whether to trace the memory used by the solution"""
+        return bool(self.memory) or self.memory_budget is not None
+
+
+def open_input(path: pathlib.Path, mapped: bool) -> io.TextIOBase:
+    """Open the input at `path` as a stream"""
+    if mapped:
+        from .inputs import MappedText
+
+        return MappedText(path)
+    return io.StringIO(path.read_text())
+
 
+def open_stream(source: str) -> io.TextIOBase:
+    """Open a file, FIFO or stdin (as "-") to read input as it arrives"""
+    if source == "-":
+        # Open stdin again so that we can close the stream like any other
+        # but without closing the actual stdin.
+        return open(sys.stdin.fileno(), closefd=False)
+    return open(source)
 
-SOLUTIONS = {day: load_solution(day) for day in range(1, 26)}
 
+def print_profile(profiler: "cProfile.Profile", top: int):
+    """Print the `top` functions of a profile by cumulative and own time"""
+    import pstats
 
-def format_duration(delta: float):
-    """Format a duration in seconds as a 3-digit SI unit duration"""
-    for symbol in ("s", "ms", "μs", "ns"):
-        if delta > 0.5:
-            break
-        delta = delta * 1000
-    return f"{delta:.2f} {symbol}"
+    stats = pstats.Stats(profiler, stream=sys.stdout).strip_dirs()
+    for sort_key, description in (("cumulative", "cumulative"), ("tottime", "own")):
+        print(f"[> Profile top {top} by {description} time <]")
+        # `print_stats` would include a header with overall stats and
+        # the (empty) list of restrictions; we only want the table.
+        stats.sort_stats(sort_key)
+        stats.print_title()
+        for func in stats.fcn_list[:top]:
+            stats.print_line(func)
+        print()
 
 
-def run_solution(day: int, example: bool, data_dir: pathlib.Path):
+def solve_instrumented(
+    day: int, module: ModuleType, data: io.TextIOBase, options: RunOptions
+) -> tuple[tuple[Any, Any], bool]:
+    """Solve while profiling and tracing as requested, returning results and success"""
+    monitor = None
+    if options.traced:
+        from .memory import MemoryMonitor
+
+        monitor = MemoryMonitor(options.memory)
+    profiler = None
+    if options.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def instrument(phase: str) -> Iterator[None]:
+        # Only the phase itself is profiled, not the snapshots of tracing.
+        with monitor(phase) if monitor is not None else contextlib.nullcontext():
+            if profiler is not None:
+                profiler.enable()
+            try:
+                yield
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+
+    try:
+        results, durations = solve_timed(module, data, instrument)
+    finally:
+        if monitor is not None:
+            monitor.stop()
+    notes = [
+        note
+        for note, active in (("profiled", options.profile), ("traced", monitor))
+        if active
+    ]
+    print(
+        f"[> Elapsed {format_durations(durations)}"
+        + (f" ({', '.join(notes)})" if notes else "")
+        + " <]"
+    )
+    if options.profile:
+        print_profile(profiler, options.profile)
+        if options.profile_dir is not None:
+            options.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(options.profile_dir / f"day{day}.prof")
+    if monitor is None:
+        return results, True
+    monitor.print_report()
+    if options.memory_budget is not None:
+        from .memory import format_size
+
+        exceeded = monitor.over_budget(options.memory_budget)
+        for phase in exceeded:
+            print(
+                f"[> Failed {phase} exceeds memory budget"
+                f" of {format_size(options.memory_budget)} <]"
+            )
+        return results, not exceeded
+    return results, True
+
+
+def run_solution(day: int, options: RunOptions = RunOptions()) -> bool:
+    """Run the solution of a day, returning whether it succeeded"""
     print(f"[> ### Day {day:3d} ### <]")
-    solver = load_solution(day)
-    if solver is not None:
-        input_path = data_dir / (f"day{day}_ex.txt" if example else f"day{day}.txt")
-        data = io.StringIO(input_path.read_text())
-        pre = time.time()
-        results = solver(data)
-        end = time.time()
-        print(f"[> Elapsed {format_duration(end-pre)} <]")
+    success = True
+    pre_import = time.perf_counter()
+    module = load_module(day)
+    if module is not None:
+        print(f"[> Import  {format_duration(time.perf_counter() - pre_import)} <]")
+        key = results = None
+        # Streamed input is only known after solving, so it cannot be cached.
+        if options.stream is None:
+            path = input_path(day, options.example, options.data_dir)
+            # The key is hashed from the file, so that we need not keep a copy
+            # of the input besides the one being solved.
+            if options.cache is not None:
+                key = ResultCache.key(
+                    day, file_digest(path), pathlib.Path(module.__file__).read_bytes()
+                )
+                # profiling and tracing need an actual run, not a cached result
+                if not options.refresh and not options.instrumented:
+                    results = options.cache.get(key)
+        if results is not None:
+            print("[> Elapsed – (cached) <]")
+        else:
+            with (
+                open_stream(options.stream)
+                if options.stream is not None
+                else open_input(path, options.mapped)
+            ) as data:
+                if options.instrumented:
+                    results, success = solve_instrumented(day, module, data, options)
+                else:
+                    results, durations = solve_timed(module, data)
+                    print(f"[> Elapsed {format_durations(durations)} <]")
+                    if key is not None:
+                        options.cache.put(key, results)
         print(OUTPUT_FORMAT.format(*results))
     else:
         print("No solution yet!")
         print("Stay tuned... 🎁")
     print(f"[> ### Day {day:3d} ### <]")
+    return success
+
+
+def run_captured(day: int, options: RunOptions) -> tuple[str, bool]:
+    """Run the solution of a day, returning its output and whether it succeeded"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            success = run_solution(day, options)
+        except Exception:
+            print("[> Failed <]")
+            print(traceback.format_exc(), end="")
+            print(f"[> ### Day {day:3d} ### <]")
+            return output.getvalue(), False
+    return output.getvalue(), success
+
+
+def run_parallel(days: list[int], options: RunOptions, jobs: int) -> int:
+    """Run several days concurrently, returning the exit code for the CLI"""
+    import concurrent.futures
+
+    failures = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        # submit everything before waiting for anything, then print in order
+        futures = [pool.submit(run_captured, day, options) for day in days]
+        for day, future in zip(days, futures):
+            try:
+                output, success = future.result()
+            # the worker itself may die, e.g. from a segfault or being killed
+            except Exception as err:
+                output, success = (
+                    f"[> ### Day {day:3d} ### <]\n[> Failed <]\n{err!r}\n",
+                    False,
+                )
+            print(output, end="")
+            failures += not success
+    return 1 if failures else 0
+
+
+#: the module used by `solve_file` in the current (worker) process
+_BATCH_MODULE: Optional[ModuleType] = None
+
+
+def load_batch_module(day: int):
+    """Load the module of `day` once for all following calls of `solve_file`"""
+    global _BATCH_MODULE
+    _BATCH_MODULE = load_module(day)
+
+
+def solve_file(path: pathlib.Path) -> dict[str, Any]:
+    """Solve the input at `path` with the module loaded by `load_batch_module`"""
+    record = {"path": str(path), "bytes": path.stat().st_size}
+    try:
+        data = io.StringIO(path.read_text())
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            (part1, part2), durations = solve_timed(_BATCH_MODULE, data)
+    except Exception as err:
+        return record | {
+            "seconds": None,
+            "part1": None,
+            "part2": None,
+            "error": repr(err),
+        }
+    return record | {
+        "seconds": sum(durations.values()),
+        "part1": part1,
+        "part2": part2,
+        "error": None,
+    }
+
+
+def write_report(records: list[dict[str, Any]], path: pathlib.Path):
+    """Write per-input records as CSV or, by default, JSON depending on the suffix"""
+    if path.suffix == ".csv":
+        import csv
+
+        with path.open("w", newline="") as stream:
+            writer = csv.DictWriter(stream, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        # results may be of any type, but usually `str` is all we need
+        path.write_text(json.dumps(records, indent=2, default=str))
+
+
+def run_batch(
+    day: int, inputs: pathlib.Path, jobs: int, report: Optional[pathlib.Path]
+) -> int:
+    """Solve a day for every input in a directory, returning the CLI exit code"""
+    import concurrent.futures
+
+    print(f"[> ### Day {day:3d} ### <]")
+    if day not in available_days():
+        print("No solution yet!")
+        return 1
+    paths = sorted(path for path in inputs.iterdir() if path.is_file())
+    if not paths:
+        print(f"No inputs in {inputs}")
+        return 1
+    pre = time.perf_counter()
+    # Each worker imports the solution just once, not once per input.
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, initializer=load_batch_module, initargs=(day,)
+    ) as pool:
+        records = list(pool.map(solve_file, paths))
+    wall = time.perf_counter() - pre
+    failed = [record for record in records if record["error"] is not None]
+    solved = [record for record in records if record["error"] is None]
+    total_bytes = sum(record["bytes"] for record in records)
+    print(
+        f"[> Inputs  {len(records)} ({len(failed)} failed) in {format_duration(wall)}"
+        f" | {len(records) / wall:.2f} inputs/s"
+        f" | {total_bytes / wall / 1e6:.2f} MB/s <]"
+    )
+    for record in sorted(solved, key=lambda record: record["seconds"])[:-6:-1]:
+        print(
+            f"[> Slowest {format_duration(record['seconds'])}"
+            f" for {record['path']} ({record['bytes']} bytes) <]"
+        )
+    for record in failed:
+        print(f"[> Failed  {record['path']}: {record['error']} <]")
+    if report is not None:
+        write_report(records, report)
+    print(f"[> ### Day {day:3d} ### <]")
+    return 1 if failed else 0
+
+
+def bench_solution(
+    day: int, example: bool, data_dir: pathlib.Path, runs: int, warmup: int
+) -> Optional[dict[str, int]]:
+    """Repeatedly time the solution of a day and summarise the timings in ns"""
+    import statistics
+
+    solver = load_solution(day)
+    if solver is None:
+        return None
+    text = input_path(day, example, data_dir).read_text()
+    samples = []
+    # Some days print progress; this must neither clutter the output
+    # nor count against the solution.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for run in range(warmup + runs):
+            # each run gets a fresh copy since `solve` consumes its input
+            data = io.StringIO(text)
+            pre = time.perf_counter_ns()
+            solver(data)
+            end = time.perf_counter_ns()
+            if run >= warmup:
+                samples.append(end - pre)
+    return {
+        "runs": runs,
+        "min_ns": min(samples),
+        "median_ns": int(statistics.median(samples)),
+        # `quantiles` needs at least two samples to interpolate
+        "p95_ns": (
+            int(statistics.quantiles(samples, n=20)[-1]) if runs > 1 else samples[0]
+        ),
+        "stddev_ns": int(statistics.pstdev(samples)),
+    }
+
+
+def compare_benchmarks(
+    current: dict[str, dict[str, int]],
+    baseline: dict[str, dict[str, int]],
+    threshold: float,
+) -> list[str]:
+    """Compare the median of benchmarks to a baseline and describe any slowdowns"""
+    slowdowns = []
+    for day, stats in current.items():
+        if day not in baseline:
+            continue
+        ratio = stats["median_ns"] / baseline[day]["median_ns"]
+        if ratio > 1 + threshold:
+            slowdowns.append(
+                f"Day {day}: median {format_duration(stats['median_ns'] / 1e9)}"
+                f" is {ratio:.2f}x the baseline"
+                f" {format_duration(baseline[day]['median_ns'] / 1e9)}"
+            )
+    return slowdowns
+
+
+def run_benchmarks(
+    days: list[int],
+    example: bool,
+    data_dir: pathlib.Path,
+    runs: int,
+    warmup: int,
+    output: Optional[pathlib.Path],
+    baseline: Optional[pathlib.Path],
+    threshold: float,
+) -> int:
+    """Benchmark several days, returning the exit code for the CLI"""
+    results = {}
+    for day in days:
+        stats = bench_solution(day, example, data_dir, runs, warmup)
+        if stats is None:
+            print(f"[> Bench Day {day:3d} | No solution yet! <]")
+            continue
+        results[str(day)] = stats
+        print(
+            f"[> Bench Day {day:3d} | {runs} runs"
+            + "".join(
+                f" | {name} {format_duration(stats[f'{name}_ns'] / 1e9)}"
+                for name in ("min", "median", "p95", "stddev")
+            )
+            + " <]"
+        )
+    if output is not None:
+        output.write_text(json.dumps({"days": results}, indent=2))
+    if baseline is not None:
+        slowdowns = compare_benchmarks(
+            results, json.loads(baseline.read_text())["days"], threshold
+        )
+        for slowdown in slowdowns:
+            print(f"[> Slowdown {slowdown} <]")
+        return 1 if slowdowns else 0
+    return 0
+
+
+def positive_int(value: str) -> int:
+    """Parse a CLI argument as an integer of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """Parse a CLI argument as an integer of at least 0"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, not {number}")
+    return number
+
+
+def size(value: str) -> int:
+    """Parse a CLI argument as a size in bytes such as `512M` or `2G`"""
+    from .memory import parse_size
+
+    return parse_size(value)
 
 
 CLI = argparse.ArgumentParser()
 CLI.add_argument(
     "DAY",
-    default=[max(SOLUTIONS, key=lambda x: (SOLUTIONS[x] is not None, x))],
+    # the default is evaluated lazily when no DAY is given
+    default=None,
     nargs="*",
     type=int,
 )
@@ -76,7 +468,188 @@ CLI.add_argument(
     default=pathlib.Path.cwd() / "data",
     help="path to directory with daily input",
 )
+CLI.add_argument(
+    "-j",
+    "--jobs",
+    type=positive_int,
+    default=None,
+    help="number of days or inputs to run concurrently"
+    " [default: 1 for days, all cores for inputs]",
+)
+CLI.add_argument(
+    "--input",
+    dest="stream",
+    metavar="PATH",
+    default=None,
+    help="stream the input of a single day from a file or FIFO, or '-' for stdin",
+)
+CLI.add_argument(
+    "--stdin",
+    dest="stream",
+    action="store_const",
+    const="-",
+    help="stream the input of a single day from stdin",
+)
+CLI.add_argument(
+    "--mmap",
+    action="store_true",
+    help="memory map the input instead of reading it into memory",
+)
 
-opts = CLI.parse_args()
-for d in opts.DAY:
-    run_solution(d, opts.example, opts.data)
+BATCH = CLI.add_argument_group("batch mode")
+BATCH.add_argument(
+    "--inputs",
+    type=pathlib.Path,
+    default=None,
+    help="solve a single day for every input in a directory",
+)
+BATCH.add_argument(
+    "--report",
+    type=pathlib.Path,
+    default=None,
+    help="file to write per-input results to as JSON or, for *.csv, as CSV",
+)
+
+PROFILE = CLI.add_argument_group("profiling and memory")
+PROFILE.add_argument(
+    "--profile",
+    metavar="TOP",
+    type=int,
+    nargs="?",
+    const=15,
+    default=0,
+    help="profile solutions and show the top functions by cumulative and own time",
+)
+PROFILE.add_argument(
+    "--profile-dir",
+    type=pathlib.Path,
+    default=None,
+    help="directory to write dayN.prof profiles to for pstats, snakeviz, ...",
+)
+PROFILE.add_argument(
+    "--mem",
+    metavar="TOP",
+    type=int,
+    nargs="?",
+    const=5,
+    default=0,
+    help="trace the memory of each phase and show the top allocation sites",
+)
+PROFILE.add_argument(
+    "--mem-budget",
+    metavar="SIZE",
+    type=size,
+    default=None,
+    help="fail if any phase allocates more than SIZE, e.g. 512M or 2G",
+)
+
+CACHE = CLI.add_argument_group("result cache")
+CACHE.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="neither use nor store cached results",
+)
+CACHE.add_argument(
+    "--refresh",
+    action="store_true",
+    help="recompute and store results even if they are cached",
+)
+CACHE.add_argument(
+    "--cache-dir",
+    type=pathlib.Path,
+    default=default_directory(),
+    help="path to directory with cached results",
+)
+CACHE.add_argument(
+    "--cache-size",
+    type=int,
+    default=64 * 1024 * 1024,
+    help="maximum size of the cache in bytes",
+)
+
+BENCH = CLI.add_argument_group("benchmarking")
+BENCH.add_argument(
+    "--bench",
+    metavar="RUNS",
+    type=positive_int,
+    nargs="?",
+    const=20,
+    default=None,
+    help="benchmark solutions over several runs instead of solving once",
+)
+BENCH.add_argument(
+    "--warmup",
+    type=non_negative_int,
+    default=3,
+    help="runs to discard before benchmarking",
+)
+BENCH.add_argument(
+    "--bench-json",
+    type=pathlib.Path,
+    default=None,
+    help="file to write benchmark results to as JSON",
+)
+BENCH.add_argument(
+    "--baseline",
+    type=pathlib.Path,
+    default=None,
+    help="JSON benchmark results to compare against",
+)
+BENCH.add_argument(
+    "--threshold",
+    type=float,
+    default=0.1,
+    help="relative slowdown of the median compared to the baseline that fails",
+)
+
+
+if __name__ == "__main__":
+    opts = CLI.parse_args()
+    days = opts.DAY or [max(available_days())]
+    # A stream can only be read once, by this process: workers do not share stdin.
+    if opts.stream is not None and (
+        len(days) != 1
+        or opts.bench is not None
+        or opts.inputs is not None
+        or opts.mmap
+        or (opts.jobs is not None and opts.jobs > 1)
+    ):
+        CLI.error(
+            "streamed input requires exactly one DAY"
+            " and no --bench, --inputs, --mmap or --jobs"
+        )
+    if opts.inputs is not None:
+        if len(days) != 1:
+            CLI.error("batch mode requires exactly one DAY")
+        sys.exit(run_batch(days[0], opts.inputs, opts.jobs, opts.report))
+    if opts.bench is not None:
+        sys.exit(
+            run_benchmarks(
+                days,
+                opts.example,
+                opts.data,
+                opts.bench,
+                opts.warmup,
+                opts.bench_json,
+                opts.baseline,
+                opts.threshold,
+            )
+        )
+    options = RunOptions(
+        example=opts.example,
+        data_dir=opts.data,
+        cache=(
+            ResultCache(opts.cache_dir, opts.cache_size) if not opts.no_cache else None
+        ),
+        refresh=opts.refresh,
+        mapped=opts.mmap,
+        stream=opts.stream,
+        profile=opts.profile,
+        profile_dir=opts.profile_dir,
+        memory=opts.mem,
+        memory_budget=opts.mem_budget,
+    )
+    if opts.jobs is not None and opts.jobs > 1:
+        sys.exit(run_parallel(days, options, opts.jobs))
+    failures = sum(not run_solution(d, options) for d in days)
+    sys.exit(1 if failures else 0)
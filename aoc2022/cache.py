@@ -0,0 +1,91 @@
+"""
+Content-addressed cache for the results of solutions
+
+Results are stored as small JSON files named after a hash of everything that
+may change a result: the day, the input data, and the source code of the
+solution. There is no need to ever invalidate entries – a changed input or
+solution simply produces a different key. Old entries are only removed to keep
+the cache below a maximum size, least recently used first.
+"""
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import pathlib
+
+
+def default_directory() -> pathlib.Path:
+    """The default cache directory, following the XDG convention"""
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "aoc2022"
+
+
+def file_digest(path: pathlib.Path, block_size: int = 2**16) -> bytes:
+    """The SHA-256 digest of a file, reading only one block at a time"""
+    digest = hashlib.sha256()
+    with path.open("rb") as stream:
+        while block := stream.read(block_size):
+            digest.update(block)
+    return digest.digest()
+
+
+class ResultCache:
+    """Size-bounded on-disk cache of solution results"""
+
+    def __init__(self, directory: pathlib.Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def key(day: int, data_digest: bytes, source: bytes) -> str:
+        """Compute the key for the results of `day` with some input and source"""
+        digest = hashlib.sha256(f"day{day}".encode())
+        # hash the parts individually so that their boundaries are unambiguous
+        digest.update(data_digest)
+        digest.update(hashlib.sha256(source).digest())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[tuple[Any, Any]]:
+        """Get the results for `key` or :py:data:`None` if they are not cached"""
+        path = self._path(key)
+        try:
+            part1, part2 = json.loads(path.read_text())["results"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        # mark the entry as recently used so that it is evicted last
+        path.touch()
+        return part1, part2
+
+    def put(self, key: str, results: tuple[Any, Any]):
+        """Store the results for `key`, unless they cannot be stored as JSON"""
+        try:
+            content = json.dumps({"results": list(results)})
+        except TypeError:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see
+        # a partial entry. `os.replace` is atomic if both are in the same place.
+        temporary = self.directory / f"{key}.{os.getpid()}.tmp"
+        temporary.write_text(content)
+        os.replace(temporary, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits its size"""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            # another process may have evicted the entry in the meantime
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -16,9 +16,27 @@ input: we must split it into blocks and calculate the totals per block.
       # total: 11000
 ```
 This task can be done easily using a *generator function* – see `sum_calories`.
+
+Since we only need the highest totals, we never have to store all of them.
+A *heap* can keep just the top few totals while the others stream past. For
+really large inputs, we can even split the input into chunks, get the top
+totals of each chunk in parallel, and then get the top totals of these.
+
+The module is directly executable from the CLI to get the top totals this way.
+
+.. code:: bash
+
+    python3 -m aoc2022.day1 data/day1.txt --workers 4
 """
 from typing import Any, Iterator
+import argparse
+import heapq
 import io
+import itertools
+import os
+import pathlib
+
+from .inputs import map_chunks, range_lines
 
 
 # Helper generator function to parse the data
@@ -35,10 +53,49 @@ def sum_calories(data: io.StringIO) -> Iterator[int]:
         yield current
 
 
+def top_calories(data: Iterator[str], k: int = 3) -> list[int]:
+    """Get the `k` highest calories per elf, from highest to lowest"""
+    # `heapq.nlargest` keeps the `k` largest items seen so far in a heap.
+    # That means it needs memory for just `k` items, no matter the input size.
+    return heapq.nlargest(k, sum_calories(data))
+
+
+def _top_calories_range(
+    path: "os.PathLike[str] | str", start: int, stop: int, k: int
+) -> list[int]:
+    return top_calories(range_lines(path, start, stop), k)
+
+
+def top_calories_parallel(
+    path: "os.PathLike[str] | str", k: int = 3, workers: int | None = None
+) -> list[int]:
+    """Get the `k` highest calories per elf of a file, using several processes"""
+    # Each chunk must start at the beginning of a block, i.e. after a blank
+    # line. Otherwise the calories of an elf would be split between chunks.
+    tops = map_chunks(_top_calories_range, path, k, separator=b"\n\n", workers=workers)
+    # The overall top `k` must be among the top `k` of each chunk.
+    return heapq.nlargest(k, itertools.chain.from_iterable(tops))
+
+
 def solve(data: io.StringIO) -> tuple[Any, Any]:
     # > we need the highest and three-highest calories
-    # `sorted` provides us with a list of calories from lowest to highest.
-    # We use subscription with a slice `[-3:]` to select only the three
-    # final/highest entries of that list.
-    top_calories = sorted(sum_calories(data))[-3:]
-    return top_calories[-1], sum(top_calories)
+    # `top_calories` provides us with a list of the three highest calories.
+    top = top_calories(data, 3)
+    return top[0], sum(top)
+
+
+CLI = argparse.ArgumentParser(prog="python -m aoc2022.day1")
+CLI.add_argument("INPUT", type=pathlib.Path, help="path to an input file")
+CLI.add_argument("-k", type=int, default=3, help="number of top totals to get")
+CLI.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="number of processes to use [default: number of CPUs]",
+)
+
+
+if __name__ == "__main__":
+    opts = CLI.parse_args()
+    top = top_calories_parallel(opts.INPUT, opts.k, opts.workers)
+    print(f"[> Top calories: {', '.join(map(str, top))} (total {sum(top)}) <]")
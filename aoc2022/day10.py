@@ -1,56 +1,158 @@
-from typing import Any, Iterator
+"""
+Day 10 - Cathode-Ray Tube
+
+The register of the CPU only changes at few points in time: after each `addx`.
+Instead of simulating the CPU cycle by cycle, we *compile* the program once into
+a timeline of these change points – the cycle at which each new register value
+starts. Since the change points are sorted, the register at any cycle can be
+looked up by searching for the last change point up to that cycle via `bisect`.
+
+The screen is just as easy to draw per change point: a register value lights up
+the same (up to) three columns in every cycle it applies. We store each row as
+the bits of an integer, so all pixels of one register value in a row are set by
+a single bitwise or. Reading the letters on the screen then is a lookup of the
+bits of each 4x6 cell in a table of known letters.
+"""
+from typing import Any, Iterable, Iterator
+import bisect
 import io
 
 Instructions = list[int | None]
 
+WIDTH, HEIGHT = 40, 6
+# Each letter is 4 pixels wide with a 1 pixel gap to the next one
+CELL_WIDTH = 5
+GLYPHS = {
+    "A": ".##. #..# #..# #### #..# #..#",
+    "B": "###. #..# ###. #..# #..# ###.",
+    "C": ".##. #..# #... #... #..# .##.",
+    "E": "#### #... ###. #... #... ####",
+    "F": "#### #... ###. #... #... #...",
+    "G": ".##. #..# #... #.## #..# .###",
+    "H": "#..# #..# #### #..# #..# #..#",
+    "I": ".### ..#. ..#. ..#. ..#. .###",
+    "J": "..## ...# ...# ...# #..# .##.",
+    "K": "#..# #.#. ##.. #.#. #.#. #..#",
+    "L": "#... #... #... #... #... ####",
+    "O": ".##. #..# #..# #..# #..# .##.",
+    "P": "###. #..# #..# ###. #... #...",
+    "R": "###. #..# #..# ###. #.#. #..#",
+    "S": ".### #... #... .##. ...# ###.",
+    "U": "#..# #..# #..# #..# #..# .##.",
+    "Z": "#### ...# ..#. .#.. #... ####",
+}
+
+
+class Timeline:
+    """Register values of a program over time, stored as the cycles they start"""
+
+    def __init__(self, instructions: Instructions, start: int = 1):
+        #: the first cycle during which each register value applies
+        self.starts = [1]
+        #: the register value from each start onwards
+        self.values = [start]
+        cycle, register = 1, start
+        for instruction in instructions:
+            if instruction is None:
+                cycle += 1
+            else:
+                cycle += 2
+                register += instruction
+                self.starts.append(cycle)
+                self.values.append(register)
+        #: the number of cycles the program runs
+        self.cycles = cycle - 1
+
+    def register(self, cycle: int) -> int:
+        """Get the register value *during* a cycle"""
+        if not 1 <= cycle <= self.cycles:
+            raise ValueError(f"cycle {cycle} not in program of {self.cycles} cycles")
+        return self.values[bisect.bisect_right(self.starts, cycle) - 1]
+
+    def signal_strength(self, cycles: Iterable[int]) -> int:
+        """Get the sum of signal strengths for all `cycles` while the program runs"""
+        return sum(
+            cycle * self.register(cycle) for cycle in cycles if cycle <= self.cycles
+        )
+
+    def spans(self) -> Iterator[tuple[int, int, int]]:
+        """Provide each register value with its `start, stop` cycles, stop excluded"""
+        return zip(self.starts, [*self.starts[1:], self.cycles + 1], self.values)
+
+
+def parse(data: io.StringIO) -> Timeline:
+    return Timeline(
+        [int(line.split()[-1]) if line.startswith("addx") else None for line in data]
+    )
+
 
-def parse(data: io.StringIO) -> Instructions:
-    return [
-        int(line.split()[-1]) if line.startswith("addx") else None
-        for line in data
-    ]
+def simulate_20(timeline: Timeline) -> int:
+    return timeline.signal_strength(range(20, 221, 40))
 
 
-def simulate_register(instructions: Instructions, start: int = 1) -> Iterator[int]:
-    register = start
-    for instruction in instructions:
-        if instruction is None:
-            yield register
-        else:
-            yield register
-            yield register
-            register += instruction
+def glyph_key(rows: Iterable[int]) -> int:
+    """Pack the 4 bit rows of a letter cell to a single integer"""
+    key = 0
+    for row in rows:
+        key = key << 4 | row
+    return key
 
 
-def simulate_20(instructions: Instructions) -> int:
-    accumulated = 0
-    for cycle, register in enumerate(simulate_register(instructions, 1), start=1):
-        if cycle % 40 == 20:
-            accumulated += register * cycle
-        if cycle > 220:
-            break
-    return accumulated
+def pixel_bits(pixels: str) -> int:
+    """Convert pixels such as `#..#` to bits, the leftmost pixel being bit 0"""
+    return sum(1 << index for index, pixel in enumerate(pixels) if pixel == "#")
 
 
-def simulate_crt(instructions: Instructions) -> list[int]:
-    screen = []
-    for cycle, register in enumerate(simulate_register(instructions, 0), start=0):
-        screen.append(register <= cycle % 40 <= register + 2)
+#: letters by the packed bits of their cells
+LETTERS = {
+    glyph_key(map(pixel_bits, glyph.split())): letter
+    for letter, glyph in GLYPHS.items()
+}
+
+
+def simulate_crt(timeline: Timeline) -> list[int]:
+    """Draw the screen as one integer per row, each lit pixel being a set bit"""
+    screen = [0] * -(-timeline.cycles // WIDTH)
+    for start, stop, register in timeline.spans():
+        # The sprite covers the columns from `register - 1` to `register + 1`.
+        # Shifting left first avoids a negative shift for the leftmost columns.
+        sprite = 0b111 << (register + 1) >> 2 if register >= -1 else 0
+        # The pixel drawn during a cycle is one less, and wraps around every row.
+        pixel, end = start - 1, stop - 1
+        while pixel < end:
+            row, column = divmod(pixel, WIDTH)
+            row_end = min(end, (row + 1) * WIDTH)
+            # all bits from `column` up to the last pixel of the span in this row
+            columns = (1 << row_end - row * WIDTH) - (1 << column)
+            screen[row] |= sprite & columns
+            pixel = row_end
     return screen
 
 
+def read_screen(screen: list[int]) -> str:
+    """Read the letters on the screen, using `?` for unknown letters"""
+    return "".join(
+        LETTERS.get(glyph_key(row >> offset & 0b1111 for row in screen[:HEIGHT]), "?")
+        for offset in range(0, WIDTH, CELL_WIDTH)
+    )
+
+
+def show_screen(screen: list[int]) -> str:
+    """Show the screen as text, e.g. to check unknown letters by eye"""
+    return "\n".join(
+        "".join("#" if row >> column & 1 else "." for column in range(WIDTH))
+        for row in screen
+    )
+
+
+def part1(timeline: Timeline) -> int:
+    return simulate_20(timeline)
+
+
+def part2(timeline: Timeline) -> str:
+    return read_screen(simulate_crt(timeline))
+
+
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    instructions = parse(data)
-    # TODO: Automate reading to string
-    # ###..####.###...##....##.####.#....#..#.
-    # #..#....#.#..#.#..#....#.#....#....#.#..
-    # ###....#..#..#.#..#....#.###..#....##...
-    # #..#..#...###..####....#.#....#....#.#..
-    # #..#.#....#....#..#.#..#.#....#....#.#..
-    # ###..####.#....#..#..##..####.####.#..#.
-    screen = simulate_crt(instructions)
-    for idx, lit in enumerate(screen):
-        if idx % 40 == 0:
-            print()
-        print("#" if lit else ".", end="")
-    return simulate_20(instructions), 0
+    timeline = parse(data)
+    return part1(timeline), part2(timeline)
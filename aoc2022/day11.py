@@ -1,9 +1,8 @@
 from __future__ import annotations
 from typing import Any, Callable
 import io
-from copy import deepcopy
 from math import prod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 
 @dataclass
@@ -38,6 +37,10 @@ class Monkey:
         self.items.clear()
         return count
 
+    def copy(self) -> Monkey:
+        """Copy the monkey so that taking turns does not modify the original"""
+        return replace(self, items=self.items.copy())
+
 
 def parse(data: io.StringIO) -> list[Monkey]:
     monkeys = []
@@ -63,8 +66,14 @@ def simulate_turns(monkeys: list[Monkey], n: int, bias: int):
     return sorted(scores)[-2:]
 
 
+def part1(monkeys: list[Monkey]) -> int:
+    return prod(simulate_turns([monkey.copy() for monkey in monkeys], 20, 3))
+
+
+def part2(monkeys: list[Monkey]) -> int:
+    return prod(simulate_turns([monkey.copy() for monkey in monkeys], 10000, 1))
+
+
 def solve(data: io.StringIO) -> tuple[Any, Any]:
     monkeys = parse(data)
-    most_busy = simulate_turns(deepcopy(monkeys), 20, 3)
-    most_busy_10k = simulate_turns(monkeys, 10000, 1)
-    return prod(most_busy), prod(most_busy_10k)
+    return part1(monkeys), part2(monkeys)
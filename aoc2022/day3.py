@@ -3,58 +3,52 @@ Day 3 - Rucksack Reorganization
 
 Our main challenge today is to efficiently find overlaps between groups. Since
 ordering does not matter (that is "abcd" and "dbac" would be equivalent) we can
-make use of Python's builtin `set` type. Like mathematical sets, `set` does not
-store order but in return can efficiently compute overlaps (`.intersection`)
-as well as other set relations such as unions.
+make use of sets. Like mathematical sets, these do not store order but in return
+can efficiently compute overlaps as well as other set relations such as unions.
+
+Python's builtin `set` type does the job, and its overlaps run entirely in C. Only
+the single item left over from each overlap is needed in Python, to look up its
+priority. Both parts are computed in one pass over the input, so that we never
+have to keep more than the current group of rucksacks.
 """
-from typing import Any, Iterator
+from typing import Any, Iterable, Optional
 import io
 import string
 
-
-# We need the priority aka score of each letter a lot, so it helps to precompute them.
-# This code is mainly long because of the speaking variable names; it could easily be
-# compressed a little.
-PRIORITY = {
-    letter: priority for priority, letter in enumerate(string.ascii_lowercase, start=1)
-} | {
-    letter: priority for priority, letter in enumerate(string.ascii_uppercase, start=27)
-}
-
-
-def sum_duplicates(data: Iterator[str]) -> int:
-    """Compute the priority sum of duplicates per line"""
-    total = 0
-    for items in data:
+ITEMS = string.ascii_lowercase + string.ascii_uppercase
+# We need the priority of items a lot, so it helps to precompute them. Using a list
+# indexed by byte values allows to directly lookup each byte of a line; `find`
+# gives -1 for bytes of no item, so their priority is 0.
+PRIORITY = [ITEMS.find(chr(byte)) + 1 for byte in range(256)]
+
+
+def sum_priorities(data: Iterable[str]) -> tuple[int, int]:
+    """Compute the priority sums of duplicates per line and per group"""
+    duplicates = badges = 0
+    # The group is the overlap of all rucksacks seen so far in the current group.
+    group: Optional[set[int]] = None
+    # Instead of collecting all rucksacks and then slicing them into groups,
+    # we count the rucksacks of the current group while going through the input.
+    members = 0
+    for line in data:
+        items = line.strip().encode()
+        if not items:
+            continue
         # To get the left and right part of each line, we use *slicing*, which
         # generalises indexing. Instead of fetching by index as `...[index]`
         # we can fetch a sequence as `...[start:stop]`.
-        # After computing the middle index `items[:middle]` and `items[middle:]`
-        # are the left and right half of the sequence.
         middle = len(items) // 2
-        # Mind the comma on the left side of the assignment. Assigning to a sequence
-        # of names automatically unpacks an iterable from the right side.
-        # Assigning to a sequence of a single name is a neat trick to get a single
-        # item that ends up in an iterable (like a set).
-        duplicate, = set(items[:middle]).intersection(items[middle:])
-        total += PRIORITY[duplicate]
-    return total
-
-
-def sum_groups(data: Iterator[str]) -> int:
-    """Compute the priority sum of duplicates per group"""
-    total = 0
-    # The `zip` builtin merges multiple iterables; `zip([0, 1, …], ["a", "b", …])`
-    # gives us `(0, "a"), (1, "b"), …`. By using it on three slice, each providing
-    # every third item but from a different start, we get the first three,
-    # the next three, … items at once.
-    # A more efficient version of this is defined in day6, using generators.
-    for a, b, c in zip(data[::3], data[1::3], data[2::3]):
-        badge, = set(a).intersection(b).intersection(c)
-        total += PRIORITY[badge]
-    return total
+        # Unpacking to a single name checks that there is exactly one duplicate.
+        (duplicate,) = set(items[:middle]).intersection(items[middle:])
+        duplicates += PRIORITY[duplicate]
+        group = set(items) if group is None else group.intersection(items)
+        members += 1
+        if members == 3:
+            (badge,) = group
+            badges += PRIORITY[badge]
+            group, members = None, 0
+    return duplicates, badges
 
 
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    data_buffer = [line.strip() for line in data]
-    return sum_duplicates(data_buffer), sum_groups(data_buffer)
+    return sum_priorities(data)
@@ -4,18 +4,64 @@ Day 5 - Supply Stacks
 This task is not that complicated, but it is the first time we deal with different
 inputs and parse a "human readable" format. Solving the actual task boils down to
 treating lists as a *stack* (via append/pop) or a sequence (via slicing/extend).
+
+Moving crates one by one gets slow when moves involve many crates. Instead, our
+stacks move an entire block of crates with a constant number of operations, by
+slicing the lists of crates – the work on the crates themselves happens in C.
 """
-from typing import Any
+from typing import Any, Iterable, Optional
 from itertools import zip_longest
-from copy import deepcopy
 import io
 
 
-Stacks = list[list[str]]
 Instruction = tuple[int, int, int]
 
 
-def parse(data: io.StringIO) -> tuple[Stacks, list[Instruction]]:
+class Stack:
+    """
+    Stack of crates that can move blocks of crates at once
+
+    Copies of a stack share their crates until either one is modified,
+    so copying is cheap for stacks that are never touched.
+    """
+
+    def __init__(self, crates: Iterable[str] = (), shared: Optional[list] = None):
+        self._crates: list[str] = shared if shared is not None else list(crates)
+        self._shared = shared is not None
+
+    def copy(self) -> "Stack":
+        self._shared = True
+        return Stack(shared=self._crates)
+
+    def _own_crates(self) -> list[str]:
+        # Crates are immutable strings and can always be shared,
+        # we just need our own list of them before adding or removing any.
+        if self._shared:
+            self._crates = self._crates.copy()
+            self._shared = False
+        return self._crates
+
+    def top(self) -> str:
+        """Get the top crate, or a space if there is none"""
+        return self._crates[-1] if self._crates else " "
+
+    def take(self, count: int) -> list[str]:
+        """Remove the top `count` crates and get them from bottom to top"""
+        crates = self._own_crates()
+        # `crates[start:]` are the last `count` crates. Note that `crates[-count:]`
+        # would be *all* crates for a `count` of 0, since `-0` is just `0`.
+        # Deleting the slice removes them from the stack at once.
+        start = max(len(crates) - count, 0)
+        taken = crates[start:]
+        del crates[start:]
+        return taken
+
+    def put(self, crates: list[str]):
+        """Put crates from bottom to top onto the stack"""
+        self._own_crates().extend(crates)
+
+
+def parse(data: io.StringIO) -> tuple[list[Stack], list[Instruction]]:
     """Parse the input to separate starting stacks and a sequence of instructions"""
     stacks = []
     for line in data:
@@ -37,8 +83,7 @@ def parse(data: io.StringIO) -> tuple[Stacks, list[Instruction]]:
                 stack.append(crate)
     # We need to post-process the parsed stack to invert them.
     # Alternatively, we could invert some of the logic later on.
-    for stack in stacks:
-        stack[:] = stack[:-1][::-1]
+    stacks = [Stack(stack[:-1][::-1]) for stack in stacks]
     instructions = []
     for line in data:
         # move 1 from 5 to 2
@@ -46,23 +91,35 @@ def parse(data: io.StringIO) -> tuple[Stacks, list[Instruction]]:
     return stacks, instructions
 
 
-def simulate_single(stacks: Stacks, instructions: list[Instruction]):
+def simulate_single(stacks: list[Stack], instructions: list[Instruction]):
     for count, source, target in instructions:
-        for _ in range(count):
-            stacks[target - 1].append(stacks[source-1].pop())
-    return ''.join(stack[-1] for stack in stacks)
+        # Moving crates one at a time puts them onto the target in reverse order.
+        # Instead of actually doing that, we reverse the entire block at once.
+        stacks[target - 1].put(stacks[source - 1].take(count)[::-1])
+    return ''.join(stack.top() for stack in stacks)
 
 
-def simulate_group(stacks: Stacks, instructions: list[Instruction]):
+def simulate_group(stacks: list[Stack], instructions: list[Instruction]):
     for count, source, target in instructions:
-        stacks[target - 1].extend(stacks[source-1][-count:])
-        stacks[source - 1][-count:] = []
-    return ''.join(stack[-1] if stack else ' ' for stack in stacks)
+        stacks[target - 1].put(stacks[source - 1].take(count))
+    return ''.join(stack.top() for stack in stacks)
+
+
+def copy_stacks(stacks: list[Stack]) -> list[Stack]:
+    """Copy the stacks so that simulating them does not modify the originals"""
+    return [stack.copy() for stack in stacks]
+
+
+def part1(parsed: tuple[list[Stack], list[Instruction]]) -> str:
+    stacks, instructions = parsed
+    return simulate_single(copy_stacks(stacks), instructions)
+
+
+def part2(parsed: tuple[list[Stack], list[Instruction]]) -> str:
+    stacks, instructions = parsed
+    return simulate_group(copy_stacks(stacks), instructions)
 
 
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    stacks, instructions = parse(data)
-    return (
-        simulate_single(deepcopy(stacks), instructions),
-        simulate_group(deepcopy(stacks), instructions),
-    )
+    parsed = parse(data)
+    return part1(parsed), part2(parsed)
@@ -10,12 +10,16 @@ Note that while the sliding window helper is convenient, it is overkill for this
 Since we only ever look at a window of about a dozen items, creating and discarding
 a string slice for each window would be more efficient. A sliding window generator
 is useful especially when the input is streamed, e.g. it is too large for memory.
+
+Even better, we do not need to look at entire windows at all. If we remember where
+we have last seen each item, each new item tells us directly how long the current
+run of unique items is. Any marker, no matter its size, is found as soon as the run
+is long enough – so we can search for several marker sizes in the same pass.
 """
-from typing import Any, TypeVar, Iterable, Iterator
+from typing import Any, TypeVar, Iterable, Iterator, Hashable
 import io
 from collections import deque
 
-
 T = TypeVar("T")
 
 
@@ -27,13 +31,14 @@ def window(items: Iterable[T], n: int) -> Iterator[tuple[T, ...]]:
     # pop/append on both sides; this matches that each new window is created by
     # appending a new and pop'ing an old item.
     # The `maxlen` makes the deque pop the oldest item when we add a new one.
-    buffer = deque([next(iterator) for _ in range(n-1)], maxlen=n)
+    buffer = deque([next(iterator) for _ in range(n - 1)], maxlen=n)
     for item in iterator:
         buffer.append(item)
         yield buffer
 
 
 def seek_marker(message: str, n: int) -> int:
+    """Find the end of the first marker of size n by looking at each window"""
     for idx, items in enumerate(window(message, n), start=n):
         # Since `set` only stores each item once, a `set` of a sequence containing
         # duplicate items is shorter than the sequence. In turn, if they have the
@@ -42,6 +47,44 @@ def seek_marker(message: str, n: int) -> int:
             return idx
 
 
+def seek_markers(
+    chunks: Iterable[Iterable[Hashable]], sizes: Iterable[int]
+) -> dict[int, int]:
+    """
+    Find the end of the first marker for each size in chunks of a message
+
+    The message may be split into chunks at any point, for example `str` or `bytes`
+    read from a stream. Sizes for which there is no marker are not in the result.
+    """
+    pending = sorted(set(sizes), reverse=True)
+    markers = {}
+    # The position of each item when we have last seen it
+    last_seen = {}
+    # The number of unique items up to and including the current position
+    run = position = 0
+    for chunk in chunks:
+        for position, item in enumerate(chunk, start=position + 1):
+            # The run can go back at most to the previous position of the new item.
+            run = min(run + 1, position - last_seen.get(item, 0))
+            last_seen[item] = position
+            # `pending` is sorted so that the smallest marker is last
+            while pending and run >= pending[-1]:
+                markers[pending.pop()] = position
+            if not pending:
+                return markers
+    return markers
+
+
+def read_chunks(data: io.TextIOBase, size: int = 2**16) -> Iterator[str]:
+    """Read the first line of a stream in chunks of at most `size` characters"""
+    # `readline` with a size stops after a line break or `size` characters. Only
+    # the first line is the message, so we stop at the first line break.
+    while chunk := data.readline(size):
+        yield chunk
+        if chunk.endswith("\n"):
+            break
+
+
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    message = next(data)
-    return seek_marker(message, 4), seek_marker(message, 14)
+    markers = seek_markers(read_chunks(data), (4, 14))
+    return markers.get(4), markers.get(14)
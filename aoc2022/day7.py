@@ -2,102 +2,165 @@
 Day 7
 
 This is an exercise of working with tree data. Building on the simple *generator*
-we used on Day 6 for handling *sequential* data, this is a nice excuse of using
-a more complex generator to handle *nested* data. Specifically, we use a generator's
-`return` and `yield from` statement.
+we used on Day 6 for handling *sequential* data, one could use a more complex,
+recursive generator to handle *nested* data. However, recursion in Python is
+limited to about a thousand levels and very deep trees would break it.
 
-More description to follow...
+Instead, we store the tree *flat*: each directory gets an index, and we keep a list
+with the parent index of each directory, a list with the size of its files, and so
+on. Since we only ever enter a directory after its parent, children always have a
+higher index than their parent. Going through the directories backwards thus visits
+all children before their parent, which allows to sum up sizes without recursion.
+
+The module is directly executable from the CLI to answer many questions about the
+directory sizes of an input at once.
+
+.. code:: bash
+
+    # total size of directories of at most 100000 and 200000
+    python3 -m aoc2022.day7 data/day7.txt --at-most 100000 200000
+    # smallest directories to delete to free 8381165, with thresholds in a file
+    python3 -m aoc2022.day7 data/day7.txt --free 8381165 @thresholds.txt
 """
-from typing import Any, Generator
-from collections import defaultdict
+from typing import Any, Iterable, Optional
+from dataclasses import dataclass, field
+from itertools import accumulate
+import argparse
+import bisect
 import io
+import pathlib
+import sys
 
-Directory = "dict[str, int | Directory]"
-ROOT = ""
+ROOT = 0
 
 
-def nested_default_dict():
-    """An infinitely nested `defaultdict`"""
-    return defaultdict(nested_default_dict)
+@dataclass
+class Tree:
+    """Directories of a file system as flat lists, indexed by directory"""
 
+    #: index of the parent of each directory, the root is its own parent
+    parents: list[int] = field(default_factory=lambda: [ROOT])
+    #: total size of the files directly in each directory
+    sizes: list[int] = field(default_factory=lambda: [0])
+    #: name of each directory
+    names: list[str] = field(default_factory=lambda: [""])
+    #: index of each directory by its parent and name
+    children: dict[tuple[int, str], int] = field(default_factory=dict)
 
-def undefault(d: Directory) -> Directory:
-    """Turn a nested defaultdict into a nested dict"""
-    return {
-        key: value if not isinstance(value, dict) else undefault(value)
-        for key, value in d.items()
-    }
+    def child(self, parent: int, name: str) -> int:
+        """Get the index of the directory `name` in `parent`, adding it if needed"""
+        # `sys.intern` keeps only one copy of equal strings, since there are many
+        # directories of the same name but in different places.
+        key = parent, sys.intern(name)
+        try:
+            return self.children[key]
+        except KeyError:
+            index = self.children[key] = len(self.parents)
+            self.parents.append(parent)
+            self.sizes.append(0)
+            self.names.append(key[1])
+            return index
 
 
-def read_tree(data: io.StringIO) -> Directory:
+def read_tree(data: io.StringIO) -> Tree:
     """Parse the tree input data format"""
     # This combines parsing the commands (cd, ls, ...)
     # with a minimal representation of ...
-    # ... the location where we `cd`'d to last, and...
-    location = [ROOT]
-    # ... the file system tree we `ls`'d so far.
-    tree = nested_default_dict()
+    # ... the file system tree we `ls`'d so far, ...
+    tree = Tree()
+    # ... the directory where we `cd`'d to last, and ...
+    cwd = ROOT
+    # ... the directories that we have `ls`'d already.
+    listed = set()
+    listing = False
     for line in data:
         # `cd` changes our current location in the file system.
-        # This is effectively a stack, which we can either...
+        # We can either...
         if line.startswith("$ cd"):
             target = line.split()[-1].strip()
             # ... reset to the root location, ...
             if target == "/":
-                location = [ROOT]
+                cwd = ROOT
             # ... go up one level, or ...
             elif target == "..":
-                location.pop()
+                cwd = tree.parents[cwd]
             # ... descend to a specific child directory.
             else:
-                location.append(target)
+                cwd = tree.child(cwd, target)
+        # Listing the same directory again would count its files twice.
+        elif line.startswith("$ ls"):
+            listing = cwd not in listed
+            listed.add(cwd)
         # We can ignore all cases but `ls` output.
-        elif not line.startswith("$") and not line.startswith("dir"):
-            size, name = line.split()
-            cwd = tree
-            for directory in location:
-                cwd = cwd[directory]
-            cwd[name] = int(size)
-    return undefault(tree)
-
-
-def directory_size(
-    tree: Directory, location: str
-) -> Generator[tuple[str, int], None, int]:
-    """Generator aggregating per-directory sizes"""
-    # This generator uses a boring part of a `for` loop to keep a total,
-    # combined with a complex part of nested generators' `return`+`yield from`.
-    # The end result is that
-    # a) the outermost consumer (think `for` loop) gets *all individual* results,
-    #    even from nested generators, and
-    # b) the inner consumers (instances of this generator) get *only the total* of
-    #    nested results.
-    total = 0
-    for child, content in tree.items():
-        if not isinstance(content, dict):
-            total += content
-        else:
-            # The `yield from` does two things here:
-            # - It passes on `yield` results from the nested `directory_size`.
-            #   including all results passed on by it from deeply nested ones.
-            # - It receives the `return` result from the nested `directory_size`.
-            total += yield from directory_size(content, location + "/" + child)
-    # `yield` the total for each location.
-    # Since each nested `directory_size` gets invoked via `yield from`, these
-    # pairs end up at the outermost consumer.
-    yield location, total
-    # `return` the total for this location and its children.
-    # Since each nested `directory_size` gets invoked via `yield from`, this
-    # ends up at the parent of the current location.
-    # A generator-`return` value is ignored by a `for` loop, so the outermost consumer
-    # does not have to care that we internally pass on this total.
-    return total
+        elif listing and not line.startswith("dir") and line.strip():
+            size, _ = line.split()
+            tree.sizes[cwd] += int(size)
+    return tree
+
+
+def directory_sizes(tree: Tree) -> list[int]:
+    """Aggregate the total size of each directory including all subdirectories"""
+    totals = tree.sizes.copy()
+    # Going backwards, each directory is complete before it is added to its parent.
+    for index in range(len(totals) - 1, ROOT, -1):
+        totals[tree.parents[index]] += totals[index]
+    return totals
+
+
+class SizeIndex:
+    """Index of directory sizes to answer many questions about them quickly"""
+
+    def __init__(self, sizes: Iterable[int]):
+        #: all directory sizes, from smallest to largest
+        self.sizes = sorted(sizes)
+        # The prefix sums tell us the total of all sizes below each position:
+        # `self.totals[n]` is the sum of the `n` smallest sizes.
+        self.totals = [0, *accumulate(self.sizes)]
+
+    def total_at_most(self, limit: int) -> int:
+        """Get the total size of all directories of at most `limit` size"""
+        # `bisect` searches a sorted list by halving the search range at each step.
+        # We get the position of the first size above `limit` – which is the number
+        # of sizes up to `limit` – in logarithmic time.
+        return self.totals[bisect.bisect_right(self.sizes, limit)]
+
+    def smallest_at_least(self, required: int) -> Optional[int]:
+        """Get the smallest directory size of at least `required`, if any"""
+        position = bisect.bisect_left(self.sizes, required)
+        return self.sizes[position] if position < len(self.sizes) else None
 
 
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    tree = read_tree(data)
-    directory_sizes = dict(directory_size(tree[ROOT], ''))
-    required = 30000000 - (70000000 - directory_sizes[ROOT])
-    return sum(size for size in directory_sizes.values() if size <= 100000), min(
-        size for size in directory_sizes.values() if size >= required
-    )
+    sizes = directory_sizes(read_tree(data))
+    required = 30000000 - (70000000 - sizes[ROOT])
+    index = SizeIndex(sizes)
+    return index.total_at_most(100000), index.smallest_at_least(required)
+
+
+# Arguments prefixed with `@` are read from a file, one argument per line.
+CLI = argparse.ArgumentParser(prog="python -m aoc2022.day7", fromfile_prefix_chars="@")
+CLI.add_argument("INPUT", type=pathlib.Path, help="path to an input file")
+CLI.add_argument(
+    "--at-most",
+    type=int,
+    nargs="+",
+    default=[],
+    help="get the total size of directories up to each limit",
+)
+CLI.add_argument(
+    "--free",
+    type=int,
+    nargs="+",
+    default=[],
+    help="get the smallest directory that frees at least each size",
+)
+
+
+if __name__ == "__main__":
+    opts = CLI.parse_args()
+    with opts.INPUT.open() as in_stream:
+        size_index = SizeIndex(directory_sizes(read_tree(in_stream)))
+    for limit in opts.at_most:
+        print(f"[> At most {limit}: {size_index.total_at_most(limit)} <]")
+    for free in opts.free:
+        print(f"[> Free {free}: {size_index.smallest_at_least(free)} <]")
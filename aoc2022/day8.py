@@ -1,70 +1,187 @@
-from typing import Any, Iterator
+"""
+Day 8 - Treetop Tree House
+
+For each tree we need to know how far we can look in each direction – either to
+the edge, or to the first tree that is at least as high. Instead of looking from
+each tree separately, we sweep along each row and column once and keep a *stack*
+of the trees we could still see from further on: a tree hides every lower tree
+before it, so those are dropped from the stack for good. Every tree is put onto
+and taken off the stack at most once, so each sweep takes linear time.
+
+If the stack is empty after dropping the lower trees, there is no tree of the
+same height or higher before – the tree is visible from the edge.
+
+For forests too large for memory, visibility alone can be found while streaming
+rows from a memory mapped file. A tree is visible from the top if it is higher
+than the *running maximum* of its column so far, which needs only one row of
+state. From the bottom, we first sweep upwards and remember the visible trees:
+since each must be higher than the one before, there are at most 10 per column.
+
+The module is directly executable from the CLI to count visible trees this way.
+
+.. code:: bash
+
+    python3 -m aoc2022.day8 data/day8.txt
+"""
+from typing import Any, Sequence
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate, compress
+from operator import gt, mul, or_
+import argparse
 import io
+import mmap
+import pathlib
 
+Map = list[bytes]
 
-Map = tuple[tuple[int]]
+# Translation table from digit characters to their value, e.g. b"3" to b"\x03"
+HEIGHTS = bytes.maketrans(b"0123456789", bytes(range(10)))
 
 
-def find_height_edges(forest: Iterator[Iterator[int]]):
-    for line in forest:
-        seen: list[int | None] = [None for _ in range(10)]
-        for index, height in enumerate(line):
-            if seen[height] is None:
-                seen[height] = index
-                for smaller in range(height):
-                    if seen[smaller] is None:
-                        seen[smaller] = -1
-        yield [index if index != -1 else None for index in seen]
+def look_back(heights: bytes) -> tuple[array, bytearray]:
+    """Get the viewing distance towards the start and visibility from there"""
+    distances = array("q", bytes(8 * len(heights)))
+    visible = bytearray(len(heights))
+    # indices of trees not hidden by any later tree so far, from high to low
+    stack = []
+    for index, height in enumerate(heights):
+        while stack and heights[stack[-1]] < height:
+            stack.pop()
+        if stack:
+            distances[index] = index - stack[-1]
+        else:
+            distances[index] = index
+            visible[index] = 1
+        stack.append(index)
+    return distances, visible
 
 
-def find_visible(edge_left, edge_right, edge_top, edge_bottom, size: int):
-    visible = set()
-    for line_idx, row_indices in enumerate(edge_left):
-        visible.update(
-            (line_idx, row_idx) for row_idx in row_indices if row_idx is not None
-        )
-    for line_idx, row_indices in enumerate(edge_right):
-        visible.update(
-            (line_idx, size - row_idx - 1) for row_idx in row_indices if row_idx is not None
-        )
-    for row_idx, line_indices in enumerate(edge_top):
+def look_along(heights: bytes) -> tuple[array, bytearray]:
+    """Get the scenic score and visibility of trees along one line of sight"""
+    forward, seen_forward = look_back(heights)
+    # Looking back along the reversed line is the same as looking forward.
+    backward, seen_backward = look_back(heights[::-1])
+    return array("q", map(mul, forward, reversed(backward))), bytearray(
+        map(or_, seen_forward, reversed(seen_backward))
+    )
+
+
+@dataclass(frozen=True)
+class Forest:
+    """Scenic scores and visibility of all trees, as rows"""
+
+    #: product of the viewing distances in all directions of each tree
+    scores: list[array]
+    #: whether each tree is visible from any edge, as 1 or 0
+    visible: list[bytearray]
+
+
+def sweep(rows: Map) -> Forest:
+    """Sweep along all rows and columns to get the views of every tree"""
+    horizontal = [look_along(row) for row in rows]
+    # `zip(*rows)` gives us the columns, which we sweep just like rows.
+    vertical = [look_along(bytes(column)) for column in zip(*rows)]
+    scores, visible = [], []
+    # The results of columns are transposed back to rows by `zip`, so that they
+    # can be combined with the results of the rows.
+    for (row_scores, row_visible), column_scores, column_visible in zip(
+        horizontal,
+        zip(*(column_scores for column_scores, _ in vertical)),
+        zip(*(column_visible for _, column_visible in vertical)),
+    ):
+        scores.append(array("q", map(mul, row_scores, column_scores)))
+        visible.append(bytearray(map(or_, row_visible, column_visible)))
+    return Forest(scores, visible)
+
+
+def parse_rows(data: io.StringIO) -> Map:
+    return [line.strip().encode().translate(HEIGHTS) for line in data if line.strip()]
+
+
+def grid_rows(content: Sequence[int]) -> list[slice]:
+    """Get the slice of each row in the bytes-like `content` of a grid"""
+    stride = content.find(b"\n") + 1
+    if stride == 0:
+        return [slice(0, len(content))] if content else []
+    # the line break may be "\r\n" or just "\n"
+    width = stride - 2 if content[stride - 2] == ord("\r") else stride - 1
+    return [
+        slice(start, start + width)
+        for start in range(0, len(content), stride)
+        if start + width <= len(content)
+    ]
+
+
+def count_visible_mapped(content: Sequence[int]) -> int:
+    """Count the visible trees in the bytes-like `content` of a grid row by row"""
+    # We never convert the digits to numbers: the digit characters are in the
+    # same order as their values, and that is all we need to compare them.
+    rows = grid_rows(content)
+    if not rows:
+        return 0
+    width = rows[0].stop - rows[0].start
+    # Running maxima start below any tree, so that the edges are always visible.
+    # Once every column has a tree of the maximum height, no further tree is visible.
+    lowest, highest = bytes(width), b"9" * width
+    # The visible trees from the bottom, as the columns visible in each row
+    bottom_visible: dict[int, list[int]] = {}
+    bottom = lowest
+    for index in range(len(rows) - 1, -1, -1):
+        if bottom == highest:
+            break
+        row = content[rows[index]]
+        # `compress` picks the columns for which the comparison is `True`.
+        if columns := list(compress(range(width), map(gt, row, bottom))):
+            bottom_visible[index] = columns
+        bottom = bytes(map(max, bottom, row))
+    total = 0
+    top = lowest
+    for index, row_slice in enumerate(rows):
+        row = content[row_slice]
+        visible = set(bottom_visible.get(index, ()))
+        if top != highest:
+            visible.update(compress(range(width), map(gt, row, top)))
+            top = bytes(map(max, top, row))
+        # Along the row, no tree is visible behind the first/last tree of maximum
+        # height, so we only have to look at the trees up to it.
+        left = row[: row.find(b"9") + 1 or width]
+        right = row[row.rfind(b"9") :][::-1] if b"9" in row else row[::-1]
+        # `accumulate` gives the running maximum along the row. With the `initial`
+        # value, each tree is compared to the maximum of the trees before it.
         visible.update(
-            (line_idx, row_idx) for line_idx in line_indices if line_idx is not None
+            compress(range(width), map(gt, left, accumulate(left, max, initial=0)))
         )
-    for row_idx, line_indices in enumerate(edge_bottom):
         visible.update(
-            (size - line_idx - 1, row_idx) for line_idx in line_indices if line_idx is not None
+            compress(
+                range(width - 1, -1, -1),
+                map(gt, right, accumulate(right, max, initial=0)),
+            )
         )
-    return len(visible)
+        total += len(visible)
+    return total
 
 
-def scenic_score(down: int, right: int, forest: Map) -> int:
-    own_height = forest[down][right]
-    score = 1
-    for line in (
-        (row[right] for row in forest[:down][::-1]),  # up
-        forest[down][:right][::-1],  # left
-        forest[down][right+1:],  # right
-        (row[right] for row in forest[down+1:]),  # down
-    ):
-        distance = 0
-        for distance, height in enumerate(line, start=1):
-            if height >= own_height:
-                break
-        score *= distance
-    return score
+def count_visible_file(path: "pathlib.Path | str") -> int:
+    """Count the visible trees of a grid file without reading it into memory"""
+    with open(path, "rb") as stream:
+        if not stream.seek(0, io.SEEK_END):
+            return 0
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return count_visible_mapped(content)
 
 
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    board = tuple(tuple(int(tree) for tree in line.strip()) for line in data)
-    edge_left = tuple(find_height_edges(board))
-    edge_right = tuple(find_height_edges(reversed(line) for line in board))
-    edge_top = tuple(find_height_edges(zip(*board)))
-    edge_bottom = tuple(find_height_edges(reversed(line) for line in zip(*board)))
-    size = len(board)
-    max_score = max(
-        scenic_score(down, right, board)
-        for down in range(1, size)
-        for right in range(1, size)
-    )
-    return find_visible(edge_left, edge_right, edge_top, edge_bottom, size), max_score
+    # Both parts need the same sweeps, which are almost all of the work. So this
+    # day is not split into phases: whichever phase sweeps would get all the time.
+    forest = sweep(parse_rows(data))
+    return sum(map(sum, forest.visible)), max(map(max, forest.scores))
+
+
+CLI = argparse.ArgumentParser(prog="python -m aoc2022.day8")
+CLI.add_argument("INPUT", type=pathlib.Path, help="path to an input file")
+
+
+if __name__ == "__main__":
+    opts = CLI.parse_args()
+    print(f"[> Visible trees: {count_visible_file(opts.INPUT)} <]")
@@ -1,56 +1,244 @@
-from typing import Any, Iterator
+"""
+Day 9 - Rope Bridge
+
+Each knot of the rope follows the knot before it: whenever the two are not
+touching anymore, the knot takes one step towards the other – diagonally if
+needed. For a step we only need to know in which direction the other knot is,
+i.e. the *sign* of the difference in each coordinate, which is -1, 0 or 1.
+
+Since a knot that does not move cannot make the knots after it move, each step
+of the head only needs to update knots until the first one that stays put.
+
+When the head moves in a straight line for long enough, the rope straightens
+out behind it. From then on, every knot just follows the head in a straight line,
+and we can move the entire rope to the end of the line at once. The cells visited
+on the way are stored as one *run* of cells per line, instead of each cell on its
+own – so both time and memory grow with the number of motions, not their lengths.
+"""
+from typing import Any, Callable, Iterable, Optional
+from array import array
+import bisect
 import io
-from functools import reduce
+
+STEPS = {"R": (1, 0), "U": (0, 1), "L": (-1, 0), "D": (0, -1)}
+
+#: callable receiving the x and y coordinates of all knots after each step,
+#: or after moving an entire straight line at once
+DebugHook = Callable[[list[int], list[int]], None]
 
 
-def draw(head: complex, tail: complex, start: complex):
-    board = [["." for _ in range(6)] for _ in range(5)]
-    for indicator, position in [("s", start), ("T", tail), ("H", head)]:
-        board[int(position.imag)][int(position.real)] = indicator
+def draw(xs: list[int], ys: list[int]):
+    """Print the knots of a rope, for use as a `DebugHook`"""
+    left, bottom = min(0, *xs), min(0, *ys)
+    board = [
+        ["." for _ in range(max(0, *xs) - left + 1)]
+        for _ in range(max(0, *ys) - bottom + 1)
+    ]
+    board[-bottom][-left] = "s"
+    # The head is drawn last, so that it is on top of any other knot.
+    for index in reversed(range(len(xs))):
+        board[ys[index] - bottom][xs[index] - left] = "H" if index == 0 else str(index)
     for line in reversed(board):
         print("".join(line))
     print()
 
 
-def move_head(instructions: list[tuple[str, int]], start: complex = 0j) -> Iterator[complex]:
-    steps = {"R": 1, "U": 1j, "L": -1, "D": -1j}
-    position = start
-    yield position
+def merge_runs(runs: array) -> array:
+    """Merge flat `line, start, stop` triples to sorted, disjoint runs per line"""
+    if not runs:
+        return array("q")
+    lines, starts, stops = runs[0::3], runs[1::3], runs[2::3]
+    line_low, low = min(lines), min(starts)
+    # Cells are numbered line after line, with a spare cell at the end of each
+    # line so that runs of neighbouring lines are never merged.
+    width = max(stops) - low + 2
+    # Packing each run as its first cell and length sorts runs by line and start
+    # without creating a tuple for each of them.
+    keys = sorted(
+        ((line - line_low) * width + start - low) * width + stop - start
+        for line, start, stop in zip(lines, starts, stops)
+    )
+    del lines, starts, stops
+    merged = array("q")
+    first, length = divmod(keys[0], width)
+    last = first + length
+    for key in keys:
+        start, length = divmod(key, width)
+        if start <= last + 1:
+            last = max(last, start + length)
+            continue
+        line, offset = divmod(first, width)
+        merged.extend((line + line_low, offset + low, offset + low + last - first))
+        first, last = start, start + length
+    line, offset = divmod(first, width)
+    merged.extend((line + line_low, offset + low, offset + low + last - first))
+    return merged
+
+
+#: number of items below which runs are never merged before counting
+MIN_COMPACT = 3 * 2**16
+
+
+class Visited:
+    """
+    Cells visited by a knot, stored as horizontal and vertical runs of cells
+
+    Runs are stored as flat `line, start, stop` triples of integers, with `start`
+    and `stop` both included. Runs may overlap, so they are merged for counting.
+    Whenever the runs have doubled since they were last merged, they are merged
+    right away – so memory grows with the distinct runs, not the steps taken.
+    """
+
+    def __init__(self):
+        #: runs of cells in a row as `y, x_start, x_stop` triples
+        self.rows = array("q")
+        #: runs of cells in a column as `x, y_start, y_stop` triples
+        self.columns = array("q")
+        self._rows_limit = self._columns_limit = MIN_COMPACT
+
+    def add(self, x: int, y: int):
+        self.rows.extend((y, x, x))
+        if len(self.rows) >= self._rows_limit:
+            self._compact_rows()
+
+    def add_row(self, y: int, x_start: int, x_stop: int):
+        self.rows.extend((y, min(x_start, x_stop), max(x_start, x_stop)))
+        if len(self.rows) >= self._rows_limit:
+            self._compact_rows()
+
+    def add_column(self, x: int, y_start: int, y_stop: int):
+        self.columns.extend((x, min(y_start, y_stop), max(y_start, y_stop)))
+        if len(self.columns) >= self._columns_limit:
+            self._compact_columns()
+
+    def _compact_rows(self):
+        self.rows = merge_runs(self.rows)
+        self._rows_limit = max(MIN_COMPACT, 2 * len(self.rows))
+
+    def _compact_columns(self):
+        self.columns = merge_runs(self.columns)
+        self._columns_limit = max(MIN_COMPACT, 2 * len(self.columns))
+
+    def __len__(self):
+        rows, columns = merge_runs(self.rows), merge_runs(self.columns)
+        # Each run covers `stop - start + 1` cells.
+        total = sum(rows[2::3]) - sum(rows[1::3]) + len(rows) // 3
+        total += sum(columns[2::3]) - sum(columns[1::3]) + len(columns) // 3
+        return total - self._crossings(rows, columns)
+
+    @staticmethod
+    def _crossings(rows: array, columns: array) -> int:
+        """Count the cells that are in both a row and a column run"""
+        # We sweep over the rows from bottom to top, keeping track of the columns
+        # that cross the current row. To quickly count these columns between two x,
+        # we use a *Binary Indexed Tree* over all x of columns: each entry holds
+        # the count of a range of x, such that any prefix sum needs few entries.
+        xs = sorted(set(columns[0::3]))
+        tree = [0] * (len(xs) + 1)
+
+        def update(x: int, change: int):
+            index = bisect.bisect_left(xs, x) + 1
+            while index < len(tree):
+                tree[index] += change
+                index += index & -index
+
+        def prefix(x: int) -> int:
+            """Count the crossing columns at or below `x`"""
+            index, count = bisect.bisect_right(xs, x), 0
+            while index:
+                count += tree[index]
+                index -= index & -index
+            return count
+
+        # A column enters the sweep at its first row and leaves after its last.
+        events = sorted(
+            [(start, x, 1) for x, start in zip(columns[0::3], columns[1::3])]
+            + [(stop + 1, x, -1) for x, stop in zip(columns[0::3], columns[2::3])]
+        )
+        crossings = pending = 0
+        # Merged rows are already sorted from bottom to top.
+        for y, start, stop in zip(rows[0::3], rows[1::3], rows[2::3]):
+            while pending < len(events) and events[pending][0] <= y:
+                _, x, change = events[pending]
+                update(x, change)
+                pending += 1
+            crossings += prefix(stop) - prefix(start - 1)
+        return crossings
+
+
+def sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+def simulate(
+    instructions: Iterable[tuple[str, int]],
+    knots: int,
+    track: Iterable[int],
+    debug: Optional[DebugHook] = None,
+) -> dict[int, Visited]:
+    """
+    Move a rope of `knots` and get the cells visited by some knots
+
+    Knots are numbered from the head as 1 to the tail as `knots`. Cells are
+    collected only for the knots in `track`.
+    """
+    xs, ys = [0] * knots, [0] * knots
+    visited = {knot: Visited() for knot in track}
+    # Tracked knots as indices into the coordinates, with their visited cells
+    tracked = [(knot - 1, visited[knot]) for knot in visited]
+    for _, cells in tracked:
+        cells.add(0, 0)
     for direction, amount in instructions:
-        # print("==", direction, amount, "==")
-        step = steps[direction]
-        for _ in range(amount):
-            position += step
-            yield position
-
-
-def follow_tail(head_positions: Iterator[complex], start: complex = 0j) -> Iterator[complex]:
-    position = start
-    for head in head_positions:
-        delta = abs(position - head)
-        print(position, "=?>", head, "by", delta)
-        assert delta < 3, f"tail lost head: {delta=}"
-        if delta < 2:
-            pass
-        elif delta == 2 or delta > 2.5:  # abs(2+2j) = 2.8284271247461903
-            position += (head - position) / 2
-        elif delta < 2.5:  # abs(1+2j) = 2.23606797749979
-            position, old_position = head, position
-            if abs(old_position.real - head.real) == 1:
-                position -= 1j if head.imag > old_position.imag else -1j
-            else:
-                position -= 1 if head.real > old_position.real else -1
-        # draw(head, position, start)
-        assert abs(position - head) < 3, f"{position=}, {head=}"
-        yield position
+        step_x, step_y = STEPS[direction]
+        remaining = amount
+        while remaining:
+            remaining -= 1
+            xs[0] += step_x
+            ys[0] += step_y
+            # The rope is straight if every knot moves exactly like the head.
+            moved, straight = knots, True
+            for knot in range(1, knots):
+                delta_x, delta_y = xs[knot - 1] - xs[knot], ys[knot - 1] - ys[knot]
+                if -1 <= delta_x <= 1 and -1 <= delta_y <= 1:
+                    moved, straight = knot, False
+                    break
+                delta_x, delta_y = sign(delta_x), sign(delta_y)
+                xs[knot] += delta_x
+                ys[knot] += delta_y
+                straight = straight and delta_x == step_x and delta_y == step_y
+            for knot, cells in tracked:
+                if knot < moved:
+                    cells.add(xs[knot], ys[knot])
+            if straight and remaining:
+                fast_forward(xs, ys, step_x * remaining, step_y * remaining, tracked)
+                remaining = 0
+            if debug is not None:
+                debug(xs, ys)
+    return visited
+
+
+def fast_forward(
+    xs: list[int],
+    ys: list[int],
+    distance_x: int,
+    distance_y: int,
+    tracked: list[tuple[int, Visited]],
+):
+    """Move a straight rope along its line, recording the runs of tracked knots"""
+    for knot, cells in tracked:
+        x, y = xs[knot], ys[knot]
+        if distance_y == 0:
+            cells.add_row(y, x + sign(distance_x), x + distance_x)
+        else:
+            cells.add_column(x, y + sign(distance_y), y + distance_y)
+    xs[:] = [x + distance_x for x in xs]
+    ys[:] = [y + distance_y for y in ys]
+
+
+def parse(data: io.StringIO) -> list[tuple[str, int]]:
+    return [(direction, int(amount)) for direction, amount in map(str.split, data)]
 
 
 def solve(data: io.StringIO) -> tuple[Any, Any]:
-    instructions = [
-        (direction, int(amount)) for direction, amount in map(str.split, data)
-    ]
-    visited2 = set(follow_tail(move_head(instructions)))
-    visited10 = set(
-        reduce(lambda head, _: follow_tail(head), range(9), move_head(instructions))
-    )
-    return len(visited2), len(visited10)
+    visited = simulate(parse(data), 10, (2, 10))
+    return len(visited[2]), len(visited[10])
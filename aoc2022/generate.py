@@ -0,0 +1,308 @@
+"""
+Synthetic inputs of arbitrary size for benchmarking
+
+Puzzle inputs are small, so they cannot tell us how solutions scale.
+Each generator in this module writes a valid input for one day, with its size
+controlled by a `scale` – `scale=1` is roughly the size of a real puzzle input,
+and the size grows linearly with `scale`. All randomness comes from a seeded
+`random.Random` so that inputs are reproducible.
+
+The module is directly executable from the CLI.
+
+.. code:: bash
+
+    # write inputs 100x the usual size for days 1 and 8 to ./data/
+    python3 -m aoc2022.generate 1 8 --scale 100
+    # measure how days 1 and 8 scale with their input size
+    python3 -m aoc2022.generate 1 8 --scaling
+"""
+from typing import Callable, Iterator
+from types import ModuleType
+import argparse
+import io
+import math
+import os
+import pathlib
+import random
+import statistics
+import string
+import tempfile
+import contextlib
+
+from .solutions import load_module, solve_timed, format_duration
+
+Generator = Callable[[int, random.Random], Iterator[str]]
+#: generators for each day, filled by `@generator`
+GENERATORS: dict[int, Generator] = {}
+
+
+def generator(day: int) -> Callable[[Generator], Generator]:
+    """Register a function as the input generator for `day`"""
+
+    def register(func: Generator) -> Generator:
+        GENERATORS[day] = func
+        return func
+
+    return register
+
+
+@generator(1)
+def calories(scale: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(250 * scale):
+        for _ in range(rng.randint(1, 15)):
+            yield f"{rng.randint(1000, 60000)}\n"
+        yield "\n"
+
+
+@generator(2)
+def rock_paper_scissors(scale: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(2500 * scale):
+        yield f"{rng.choice('ABC')} {rng.choice('XYZ')}\n"
+
+
+@generator(3)
+def rucksacks(scale: int, rng: random.Random) -> Iterator[str]:
+    # Each group shares exactly one badge and each rucksack has exactly one item
+    # in both compartments. We guarantee this by giving each elf its own pool
+    # of items, disjoint from the other elves in the group and the badge.
+    items = string.ascii_letters
+    for _ in range(100 * scale):
+        badge, *others = rng.sample(items, len(items))
+        for pool in (others[0:17], others[17:34], others[34:51]):
+            duplicate, *unique = pool
+            half = rng.randint(4, 16)
+            left = [badge, duplicate, *rng.choices(unique[:8], k=half - 2)]
+            right = [duplicate, *rng.choices(unique[8:], k=half - 1)]
+            rng.shuffle(left)
+            rng.shuffle(right)
+            yield "".join(left + right) + "\n"
+
+
+@generator(4)
+def section_pairs(scale: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(1000 * scale):
+        left_low, left_high = sorted(rng.choices(range(1, 100), k=2))
+        right_low, right_high = sorted(rng.choices(range(1, 100), k=2))
+        yield f"{left_low}-{left_high},{right_low}-{right_high}\n"
+
+
+@generator(5)
+def crate_stacks(scale: int, rng: random.Random) -> Iterator[str]:
+    stacks = 9
+    heights = [rng.randint(1, 8 * scale) for _ in range(stacks)]
+    for level in range(max(heights), 0, -1):
+        yield " ".join(
+            f"[{rng.choice(string.ascii_uppercase)}]" if height >= level else "   "
+            for height in heights
+        ) + "\n"
+    yield " " + "   ".join(str(index) for index in range(1, stacks + 1)) + " \n"
+    yield "\n"
+    # Only the number of crates per stack matters for valid moves. We always
+    # leave one crate so that each stack has a top crate at the end.
+    for _ in range(500 * scale):
+        source = rng.choice([index for index in range(stacks) if heights[index] > 1])
+        target = rng.choice([index for index in range(stacks) if index != source])
+        count = rng.randint(1, heights[source] - 1)
+        heights[source] -= count
+        heights[target] += count
+        yield f"move {count} from {source + 1} to {target + 1}\n"
+
+
+@generator(6)
+def signal(scale: int, rng: random.Random) -> Iterator[str]:
+    # With just three distinct symbols there cannot be any marker,
+    # so the search has to go through the entire signal first.
+    yield "".join(rng.choices("abc", k=4000 * scale))
+    yield "".join(rng.sample(string.ascii_lowercase[3:], 14)) + "\n"
+
+
+@generator(7)
+def terminal(scale: int, rng: random.Random) -> Iterator[str]:
+    # Build a random tree of directories as a list of children per directory.
+    # New directories are mostly attached to the previous one, which makes for
+    # deep trees, and otherwise to a random one, which makes for wide trees.
+    children: list[list[int]] = [[]]
+    for index in range(1, 200 * scale):
+        parent = index - 1 if rng.random() < 0.5 else rng.randrange(index)
+        children[parent].append(index)
+        children.append([])
+    yield "$ cd /\n"
+    # Walk the tree depth-first, using an explicit stack to allow for deep trees.
+    # A `None` on the stack means to go back up one directory.
+    pending: list[int | None] = [0]
+    while pending:
+        directory = pending.pop()
+        if directory is None:
+            yield "$ cd ..\n"
+            continue
+        if directory != 0:
+            yield f"$ cd d{directory}\n"
+            pending.append(None)
+        yield "$ ls\n"
+        for child in children[directory]:
+            yield f"dir d{child}\n"
+        for index in range(rng.randint(0, 5)):
+            yield f"{rng.randint(1, 300000)} f{index}.{rng.choice(['txt', 'dat'])}\n"
+        pending.extend(reversed(children[directory]))
+
+
+@generator(8)
+def forest(scale: int, rng: random.Random) -> Iterator[str]:
+    # the area and thus input size grows linearly with the scale
+    size = round(99 * math.sqrt(scale))
+    for _ in range(size):
+        yield "".join(rng.choices(string.digits, k=size)) + "\n"
+
+
+@generator(9)
+def rope_motions(scale: int, rng: random.Random) -> Iterator[str]:
+    # Short moves keep the rope tangled, so every step must be simulated. Long
+    # moves pull it straight, after which the rest of the move can be skipped.
+    for _ in range(2000 * scale):
+        amount = rng.randint(1, 20) if rng.random() < 0.5 else rng.randint(50, 1000)
+        yield f"{rng.choice('RULD')} {amount}\n"
+
+
+@generator(10)
+def cpu_program(scale: int, rng: random.Random) -> Iterator[str]:
+    register = 1
+    for _ in range(150 * scale):
+        if rng.random() < 0.3:
+            yield "noop\n"
+        else:
+            # keep the register, i.e. the sprite, on the screen
+            value = rng.randint(-5, 5)
+            value = -value if not 0 <= register + value < 40 else value
+            register += value
+            yield f"addx {value}\n"
+
+
+@generator(11)
+def monkeys(scale: int, rng: random.Random) -> Iterator[str]:
+    count = 4 + int(math.sqrt(scale))
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61]
+    tests = rng.sample(primes, count) if count <= len(primes) else primes
+    count = len(tests)
+    # Squaring is the most expensive operation, so only a single monkey does it.
+    square = rng.randrange(count)
+    for index, test in enumerate(tests):
+        targets = rng.sample([other for other in range(count) if other != index], 2)
+        items = ", ".join(str(rng.randint(50, 99)) for _ in range(2 * scale))
+        if index == square:
+            operation = "old * old"
+        else:
+            operation = f"old {rng.choice('+*')} {rng.randint(1, 9)}"
+        if index:
+            yield "\n"
+        yield f"Monkey {index}:\n"
+        yield f"  Starting items: {items}\n"
+        yield f"  Operation: new = {operation}\n"
+        yield f"  Test: divisible by {test}\n"
+        yield f"    If true: throw to monkey {targets[0]}\n"
+        yield f"    If false: throw to monkey {targets[1]}\n"
+
+
+def write_input(day: int, scale: int, seed: int, path: pathlib.Path):
+    """Write a synthetic input for `day` to `path`"""
+    rng = random.Random(seed)
+    with path.open("w") as stream:
+        stream.writelines(GENERATORS[day](scale, rng))
+
+
+def fit_exponent(sizes: list[int], durations: list[float]) -> float:
+    """Fit the exponent `k` of `duration ~ size**k` by least squares in log-log"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(duration) for duration in durations]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum(
+        (x - x_mean) ** 2 for x in xs
+    )
+
+
+def time_solution(module: ModuleType, text: str, runs: int, warmup: int) -> list[float]:
+    """Time several runs of the solution of `module` after some warmup runs"""
+    durations = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for run in range(warmup + runs):
+            # each run gets a fresh copy since solutions consume their input
+            _, phases = solve_timed(module, io.StringIO(text))
+            if run >= warmup:
+                durations.append(sum(phases.values()))
+    return durations
+
+
+def report_scaling(
+    day: int, scales: list[int], seed: int, runs: int = 5, warmup: int = 1
+):
+    """Time the solution of `day` for several scales and print its complexity"""
+    module = load_module(day)
+    sizes, durations = [], []
+    print(f"[> ### Day {day:3d} ### <]")
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / f"day{day}.txt"
+        for scale in scales:
+            write_input(day, scale, seed, path)
+            samples = time_solution(module, path.read_text(), runs, warmup)
+            sizes.append(path.stat().st_size)
+            # The minimum is the least disturbed by anything else on the machine.
+            durations.append(min(samples))
+            print(
+                f"[> Scale {scale:5d}x | {sizes[-1]:12d} bytes"
+                f" | min {format_duration(durations[-1])}"
+                f" | median {format_duration(statistics.median(samples))} <]"
+            )
+    if len(scales) > 1:
+        exponent = fit_exponent(sizes, durations)
+        note = " super-linear!" if exponent > 1.2 else ""
+        print(f"[> Empirical complexity O(n^{exponent:.2f}){note} <]")
+    print(f"[> ### Day {day:3d} ### <]")
+
+
+CLI = argparse.ArgumentParser(prog="python -m aoc2022.generate")
+CLI.add_argument("DAY", nargs="+", type=int, choices=sorted(GENERATORS))
+CLI.add_argument("--scale", type=int, default=1, help="size relative to a puzzle input")
+CLI.add_argument("--seed", type=int, default=0, help="seed for random inputs")
+CLI.add_argument(
+    "--output",
+    type=pathlib.Path,
+    default=pathlib.Path.cwd() / "data",
+    help="path to directory to write inputs to",
+)
+CLI.add_argument(
+    "--scaling",
+    action="store_true",
+    help="instead of writing inputs, report how solutions scale with input size",
+)
+CLI.add_argument(
+    "--scales",
+    type=int,
+    nargs="+",
+    default=[1, 10, 100],
+    help="scales to measure for --scaling",
+)
+CLI.add_argument(
+    "--runs",
+    type=int,
+    default=5,
+    help="number of timed runs per scale for --scaling",
+)
+CLI.add_argument(
+    "--warmup",
+    type=int,
+    default=1,
+    help="number of untimed runs per scale before the timed ones",
+)
+
+
+if __name__ == "__main__":
+    opts = CLI.parse_args()
+    if opts.runs < 1:
+        CLI.error("--runs must be at least 1")
+    if opts.warmup < 0:
+        CLI.error("--warmup must be at least 0")
+    for d in opts.DAY:
+        if opts.scaling:
+            report_scaling(d, opts.scales, opts.seed, opts.runs, opts.warmup)
+        else:
+            opts.output.mkdir(parents=True, exist_ok=True)
+            write_input(d, opts.scale, opts.seed, opts.output / f"day{d}.txt")
@@ -0,0 +1,182 @@
+"""
+Input data sources for solutions
+
+Solutions read their input as an `io.StringIO`, which means the entire input is
+decoded and copied into memory before solving starts. This module provides
+alternatives that behave like a (read-only) text stream but avoid the copies.
+"""
+from typing import Any, Callable, Iterator, Sequence, TypeVar
+import codecs
+import functools
+import io
+import itertools
+import mmap
+import os
+
+T = TypeVar("T")
+
+
+class MappedText(io.TextIOBase):
+    """
+    Read-only text stream over a memory mapped file
+
+    The file content is only paged in by the operating system as it is read,
+    and lines are decoded one at a time. Solutions that consume their input
+    line by line thus run in constant memory.
+
+    Note that in contrast to files opened in text mode, newlines are *not*
+    translated; lines end in whatever the file uses.
+    """
+
+    def __init__(self, path: "os.PathLike[str] | str", encoding: str = "utf-8"):
+        self.name = os.fspath(path)
+        self._encoding = encoding
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        #: the raw, bytes-like content of the file
+        self.mapping: "mmap.mmap | bytes" = b""
+        # empty files cannot be mapped, but there is nothing to read anyway
+        if self._size:
+            self.mapping = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = self.mapping
+        else:
+            self._buffer = io.BytesIO()
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        # Whole lines never end inside a multi-byte character, so they can be
+        # decoded directly without the overhead of the incremental decoder.
+        self._decode_line = functools.partial(str, encoding=encoding)
+
+    @property
+    def encoding(self) -> str:
+        return self._encoding
+
+    def readable(self) -> bool:
+        return True
+
+    def readline(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            return self._decoder.decode(self._buffer.readline())
+        # Just as for `read`, a byte count may end inside a multi-byte character.
+        while not (chunk := self._decoder.decode(line := self._readline_bytes(size))):
+            if not line:
+                return chunk
+        return chunk
+
+    def _readline_bytes(self, size: int) -> bytes:
+        """Read a line of at most `size` bytes"""
+        if isinstance(self._buffer, io.BytesIO):
+            return self._buffer.readline(size)
+        # `mmap.readline` has no size, so it would copy the rest of a long line.
+        # Instead, we look for the line break only within the next `size` bytes.
+        start = self._buffer.tell()
+        end = self._buffer.find(b"\n", start, start + size)
+        return self._buffer.read(size if end == -1 else end + 1 - start)
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            return self._decoder.decode(self._buffer.read(), final=True)
+        # A byte count may end inside a multi-byte character, for which the
+        # decoder returns nothing yet. Only an empty read means the end of file.
+        while not (chunk := self._decoder.decode(self._buffer.read(size))):
+            if self._buffer.tell() == self._size:
+                return chunk
+        return chunk
+
+    def __iter__(self) -> Iterator[str]:
+        # Iterating via builtins avoids calling a Python method for each line.
+        # Since `map` and `iter` are lazy, breaking out of a loop leaves the
+        # stream exactly after the last line seen by the loop.
+        return map(self._decode_line, self.byte_lines())
+
+    def __next__(self) -> str:
+        line = self._buffer.readline()
+        if not line:
+            raise StopIteration
+        return self._decode_line(line)
+
+    def byte_lines(self) -> Iterator[bytes]:
+        """Iterate over the remaining lines without decoding them"""
+        return iter(self._buffer.readline, b"")
+
+    def close(self):
+        if not self.closed:
+            self._buffer.close()
+            self._file.close()
+        super().close()
+
+
+def split_offsets(
+    content: Sequence[int], parts: int, separator: bytes = b"\n"
+) -> list[tuple[int, int]]:
+    """
+    Split bytes-like `content` into up to `parts` ranges of roughly equal size
+
+    Each range starts right after a `separator`, so that for example no line or
+    block of lines is split across ranges. Ranges are given as `(start, stop)`
+    offsets, suitable for `range_lines` or slicing.
+    """
+    size = len(content)
+    bounds = [0]
+    for part in range(1, parts):
+        found = content.find(separator, max(size * part // parts, bounds[-1]))
+        if found == -1:
+            break
+        bounds.append(found + len(separator))
+    bounds.append(size)
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+
+
+def range_lines(
+    path: "os.PathLike[str] | str", start: int, stop: int, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """
+    Iterate over the lines of a file from byte offset `start` to `stop`
+
+    The `stop` offset should be at the end of a line, as from `split_offsets`;
+    otherwise, the last line is read in full.
+    """
+    remaining = stop - start
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        for line in stream:
+            yield line.decode(encoding)
+            remaining -= len(line)
+            if remaining <= 0:
+                break
+
+
+def map_chunks(
+    function: Callable[..., T],
+    path: "os.PathLike[str] | str",
+    *args: Any,
+    separator: bytes = b"\n",
+    workers: int | None = None,
+) -> list[T]:
+    """
+    Apply `function` to chunks of a file in several processes
+
+    The file is split by `split_offsets` and each chunk is handled by a call
+    `function(path, start, stop, *args)`, for example using `range_lines`. The
+    `function` must be importable by the worker processes, i.e. defined at the
+    top level of a module. An empty file has no chunks and gives no results.
+    """
+    # Most runs never use several processes, so the executor is imported lazily.
+    import concurrent.futures
+
+    workers = workers or os.cpu_count() or 1
+    with open(path, "rb") as stream:
+        # empty files cannot be mapped, but there is nothing to split anyway
+        if not stream.seek(0, io.SEEK_END):
+            return []
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # We use several chunks per worker so that no worker is left waiting.
+            chunks = split_offsets(content, workers * 4, separator)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(
+                function,
+                itertools.repeat(path),
+                *zip(*chunks),
+                *map(itertools.repeat, args),
+            )
+        )
@@ -0,0 +1,167 @@
+"""
+Memory instrumentation for solutions
+
+Python's `tracemalloc` tracks every allocation made by the interpreter, which
+lets us see both how much memory a phase needs at its peak and which lines of
+code hold on to memory. The operating system's view is the maximum resident set
+size (RSS) of the process, which includes everything that is not traced – such
+as memory mapped input files and the interpreter itself.
+"""
+from typing import Iterator, Optional
+from dataclasses import dataclass
+import contextlib
+import fnmatch
+import re
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+#: the peak RSS in `/proc/self/status`, compiled before any memory is traced
+PEAK_RSS = re.compile(r"^VmHWM:\s*(\d+) kB", re.MULTILINE)
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def format_size(size: float) -> str:
+    """Format a size in bytes as a 3-digit binary unit size"""
+    for symbol in ("B", "KiB", "MiB", "GiB"):
+        if size < 1000:
+            break
+        size = size / 1024
+    else:
+        symbol = "TiB"
+    return f"{size:.2f} {symbol}"
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as `512M` or `2G` to bytes"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d*)?)\s*([KMGT]?)i?B?\s*", size.upper())
+    if match is None:
+        raise ValueError(f"invalid size: {size!r}")
+    return int(float(match[1]) * SIZE_UNITS[match[2]])
+
+
+def max_rss() -> Optional[int]:
+    """The maximum resident set size of this process so far in bytes, if known"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size to the current one, if supported"""
+    # Linux resets the "high water mark" `VmHWM` when writing 5 to `clear_refs`.
+    # Elsewhere, the peak can only be read for the entire process so far.
+    try:
+        with open("/proc/self/clear_refs", "w") as stream:
+            stream.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss() -> Optional[int]:
+    """The peak resident set size since `reset_peak_rss` in bytes, if known"""
+    try:
+        with open("/proc/self/status") as stream:
+            status = stream.read()
+    except OSError:
+        return None
+    match = PEAK_RSS.search(status)
+    return int(match[1]) * 1024 if match is not None else None
+
+
+@dataclass
+class PhaseMemory:
+    """Memory used by a single phase of a solution"""
+
+    #: peak of memory allocated by the phase, on top of what it started with
+    traced_peak: int
+    #: peak resident set size during the phase or, if `rss_cumulative`, so far
+    rss_peak: Optional[int]
+    #: whether `rss_peak` includes everything before the phase as well
+    rss_cumulative: bool
+    #: lines of code whose memory changed the most during the phase
+    top_sites: list[tracemalloc.StatisticDiff]
+
+
+class MemoryMonitor:
+    """Track the peak memory and top allocation sites of each phase"""
+
+    def __init__(self, top: int):
+        self.top = top
+        self.phases: dict[str, PhaseMemory] = {}
+        # ignore the bookkeeping of tracing itself
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        # Filters compile their pattern on first use, which must not be traced.
+        for trace_filter in self._filters:
+            fnmatch.fnmatch(__file__, trace_filter.filename_pattern)
+
+    @contextlib.contextmanager
+    def __call__(self, phase: str) -> Iterator[None]:
+        per_phase = reset_peak_rss()
+        # Tracing is started lazily so that memory allocated before the first
+        # phase, such as the raw input, does not count against the solution.
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # Memory still held from earlier phases, such as the parsed input, is
+        # not charged to this phase: we only report what changed since now.
+        start = self._snapshot() if self.top else None
+        start_traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            rss = peak_rss() if per_phase else max_rss()
+            top_sites = (
+                self._snapshot().compare_to(start, "lineno")[: self.top]
+                if start is not None
+                else []
+            )
+            self.phases[phase] = PhaseMemory(
+                peak - start_traced, rss, not per_phase, top_sites
+            )
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def stop(self):
+        """Stop tracing and free the memory used for it"""
+        tracemalloc.stop()
+
+    def print_report(self):
+        for phase, memory in self.phases.items():
+            rss = format_size(memory.rss_peak) if memory.rss_peak is not None else "–"
+            label = "max RSS so far" if memory.rss_cumulative else "peak RSS"
+            print(
+                f"[> Memory {phase}: peak {format_size(memory.traced_peak)} traced"
+                f" | {label} {rss} <]"
+            )
+            for site in memory.top_sites:
+                frame = site.traceback[0]
+                # memory may also be freed, which shows as a negative change
+                sign = "-" if site.size_diff < 0 else "+"
+                print(
+                    f"    {sign + format_size(abs(site.size_diff)):>11}"
+                    f" in {site.count_diff:+8d} blocks"
+                    f" at {frame.filename}:{frame.lineno}"
+                )
+
+    def over_budget(self, budget: int) -> list[str]:
+        """The phases whose own traced peak exceeded a budget in bytes"""
+        return [
+            phase
+            for phase, memory in self.phases.items()
+            if memory.traced_peak > budget
+        ]
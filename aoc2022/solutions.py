@@ -0,0 +1,139 @@
+"""
+Loading and timing the solutions of each day
+
+Every day is a module `dayN` defining `solve`, and optionally the phases of
+`PhasedSolution` to time parsing and each part on their own. This is shared by
+the CLI of the package and by tools such as `aoc2022.generate`.
+"""
+from typing import Protocol, Any, Optional, Callable, ContextManager
+from types import ModuleType
+import contextlib
+import time
+import io
+import importlib
+import pkgutil
+import re
+import sys
+
+
+class Solution(Protocol):
+    def __call__(self, data: io.StringIO) -> tuple[Any, Any]:
+        raise NotImplementedError
+
+
+class PhasedSolution(Protocol):
+    """
+    A solution split into phases that can be timed individually
+
+    Both parts receive the same result of `parse` and must not modify it.
+    """
+
+    def parse(self, data: io.StringIO) -> Any:
+        raise NotImplementedError
+
+    def part1(self, parsed: Any) -> Any:
+        raise NotImplementedError
+
+    def part2(self, parsed: Any) -> Any:
+        raise NotImplementedError
+
+
+PHASES = ("parse", "part1", "part2")
+
+
+def available_days() -> list[int]:
+    """Find all days with a solution *without* importing them"""
+    # `pkgutil` only looks at the files of the package, so this is cheap compared
+    # to importing each module and its module-level tables.
+    package_path = sys.modules[__package__].__path__
+    return sorted(
+        int(match[1])
+        for module in pkgutil.iter_modules(package_path)
+        if (match := re.fullmatch(r"day(\d+)", module.name))
+    )
+
+
+def load_module(day: int) -> Optional[ModuleType]:
+    """Load the module of a given day"""
+    if day not in available_days():
+        return None
+    # this programmatically performs a relative import
+    # for day 5, this is equivalent to `import .day5 as module`
+    module = importlib.import_module(f".day{day}", __package__)
+    assert hasattr(
+        module, "solve"
+    ), "Each day must define solve(:io.StringIO) -> tuple[Any, Any]"
+    return module
+
+
+def load_solution(day: int) -> Optional[Solution]:
+    """Load the solution for a given day"""
+    module = load_module(day)
+    return module.solve if module is not None else None
+
+
+def is_phased(module: ModuleType) -> bool:
+    """Check whether a day module also satisfies the `PhasedSolution` protocol"""
+    return all(callable(getattr(module, phase, None)) for phase in PHASES)
+
+
+#: callable to get a context manager wrapping each phase of a solution by name
+PhaseMonitor = Callable[[str], ContextManager[Any]]
+
+
+def run_phases(
+    solution: PhasedSolution,
+    data: io.StringIO,
+    monitor: PhaseMonitor = contextlib.nullcontext,
+) -> tuple[tuple[Any, Any], dict[str, float]]:
+    """Run a phased solution, returning both results and the duration per phase"""
+    durations = {}
+    with monitor("parse"):
+        pre = time.perf_counter()
+        parsed = solution.parse(data)
+        durations["parse"] = time.perf_counter() - pre
+    results = []
+    for phase in (solution.part1, solution.part2):
+        with monitor(phase.__name__):
+            pre = time.perf_counter()
+            results.append(phase(parsed))
+            durations[phase.__name__] = time.perf_counter() - pre
+    return (results[0], results[1]), durations
+
+
+def format_duration(delta: float):
+    """Format a duration in seconds as a 3-digit SI unit duration"""
+    for symbol in ("s", "ms", "μs", "ns"):
+        if delta > 0.5:
+            break
+        delta = delta * 1000
+    return f"{delta:.2f} {symbol}"
+
+
+def format_durations(durations: dict[str, float]) -> str:
+    """Format the total and, if there are several, individual phase durations"""
+    total = format_duration(sum(durations.values()))
+    if len(durations) == 1:
+        return total
+    return (
+        f"{total} ("
+        + " | ".join(
+            f"{phase} {format_duration(duration)}"
+            for phase, duration in durations.items()
+        )
+        + ")"
+    )
+
+
+def solve_timed(
+    module: ModuleType,
+    data: io.TextIOBase,
+    monitor: PhaseMonitor = contextlib.nullcontext,
+) -> tuple[tuple[Any, Any], dict[str, float]]:
+    """Run the solution of a module, returning the results and phase durations"""
+    if is_phased(module):
+        return run_phases(module, data, monitor)
+    with monitor("solve"):
+        pre = time.perf_counter()
+        results = module.solve(data)
+        return results, {"solve": time.perf_counter() - pre}